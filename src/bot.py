@@ -3,10 +3,32 @@ import asyncio
 from loguru import logger
 from aiogram.fsm.storage.redis import RedisStorage
 
-from settings import TOKEN, REDIS_URL
+from settings import (
+    TOKEN, REDIS_URL,
+    HTTP_LIMIT, HTTP_LIMIT_PER_HOST, HTTP_DNS_CACHE_TTL, HTTP_KEEPALIVE_TIMEOUT,
+    HH_CACHE_BACKEND, HH_CACHE_TTL, HH_CACHE_MAX_SIZE,
+    HH_RATE_LIMIT, HH_MAX_RETRIES, HH_BACKOFF_BASE, HH_BACKOFF_MAX,
+    HH_CIRCUIT_FAILURE_THRESHOLD, HH_CIRCUIT_RECOVERY_TIMEOUT,
+    SENT_FILTER_BACKEND, SENT_FILTER_CAPACITY, SENT_FILTER_ERROR_RATE,
+    SENT_WRITER_BATCH_SIZE, SENT_WRITER_FLUSH_INTERVAL,
+    SENT_RETENTION_DAYS, SENT_RETENTION_BATCH_SIZE, SENT_RETENTION_INTERVAL,
+    SENT_RETENTION_PAUSE, SENT_RETENTION_VACUUM_PAGES,
+    TELEGRAM_GLOBAL_RATE, TELEGRAM_CHAT_RATE,
+    TELEGRAM_MAX_RETRIES, TELEGRAM_BACKOFF_BASE, TELEGRAM_BACKOFF_MAX,
+    POLL_INTERVAL
+)
+from collectors.cache import create_response_cache
+from collectors.http_client import HttpClient
+from collectors.rate_limiter import RateLimiter
+from collectors.subscription_index import SubscriptionIndex
 from handlers import base, user_settings
+from handlers.send_scheduler import TelegramSendScheduler
 from handlers.vacancy_sender import VacanciesSender
-from database.database import init_db
+from database.database import init_db, Session
+from database.services import UserSettingsServices
+from database.sent_filter import create_sent_vacancies_filter
+from database.sent_writer import SentVacanciesWriter
+from database.retention import SentVacanciesRetention
 from database.middleware import DatabaseMiddlewareWithCommit, DatabaseMiddlewareWithoutCommit
 from analytics.run import parse_and_push_analytics
 
@@ -15,22 +37,86 @@ async def main():
     await init_db()
 
     bot = Bot(token=TOKEN)
+    http_client = HttpClient(
+        limit=HTTP_LIMIT,
+        limit_per_host=HTTP_LIMIT_PER_HOST,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT
+    )
+    # Каждый запрос опрашивается раз в POLL_INTERVAL, поэтому кеш дольше
+    # интервала отдавал бы повторным опросам устаревшую первую страницу
+    cache_ttl = HH_CACHE_TTL
+    if cache_ttl >= POLL_INTERVAL:
+        cache_ttl = max(1, int(POLL_INTERVAL) - 1)
+        logger.warning(
+            f"HH_CACHE_TTL={HH_CACHE_TTL} не меньше интервала опроса {POLL_INTERVAL}, используется {cache_ttl} сек.")
+    cache = create_response_cache(
+        HH_CACHE_BACKEND, cache_ttl, HH_CACHE_MAX_SIZE, REDIS_URL)
+    rate_limiter = RateLimiter(
+        rate=HH_RATE_LIMIT,
+        max_retries=HH_MAX_RETRIES,
+        backoff_base=HH_BACKOFF_BASE,
+        backoff_max=HH_BACKOFF_MAX,
+        failure_threshold=HH_CIRCUIT_FAILURE_THRESHOLD,
+        recovery_timeout=HH_CIRCUIT_RECOVERY_TIMEOUT
+    )
+
+    subscription_index = SubscriptionIndex()
+    sent_filter = create_sent_vacancies_filter(
+        SENT_FILTER_BACKEND, SENT_FILTER_CAPACITY, SENT_FILTER_ERROR_RATE, REDIS_URL)
+    send_scheduler = TelegramSendScheduler(
+        global_rate=TELEGRAM_GLOBAL_RATE,
+        chat_rate=TELEGRAM_CHAT_RATE,
+        max_retries=TELEGRAM_MAX_RETRIES,
+        backoff_base=TELEGRAM_BACKOFF_BASE,
+        backoff_max=TELEGRAM_BACKOFF_MAX
+    )
+    sent_writer = SentVacanciesWriter(
+        SENT_WRITER_BATCH_SIZE, SENT_WRITER_FLUSH_INTERVAL)
+    retention = SentVacanciesRetention(
+        days=SENT_RETENTION_DAYS,
+        batch_size=SENT_RETENTION_BATCH_SIZE,
+        interval=SENT_RETENTION_INTERVAL,
+        pause=SENT_RETENTION_PAUSE,
+        vacuum_pages=SENT_RETENTION_VACUUM_PAGES
+    )
+    async with Session() as session:
+        subscription_index.build(await UserSettingsServices(session).get_all_users_settings())
+        if sent_filter:
+            await sent_filter.warm(session)
 
     redis = RedisStorage.from_url(REDIS_URL)
     dp = Dispatcher(storage=redis)
+    dp["subscription_index"] = subscription_index
 
     dp.update.middleware.register(DatabaseMiddlewareWithoutCommit())
     dp.update.middleware.register(DatabaseMiddlewareWithCommit())
 
     dp.include_routers(base.router, user_settings.router)
 
+    sender = VacanciesSender(
+        bot, http_client, cache, rate_limiter, subscription_index, sent_filter, sent_writer, send_scheduler)
     try:
         logger.info("Bot started!")
-        asyncio.create_task(VacanciesSender(bot).start_sending())
+        sent_writer.start()
+        if SENT_RETENTION_DAYS:
+            retention.start()
+        sender.start()
         asyncio.create_task(parse_and_push_analytics())
         await bot.delete_webhook(drop_pending_updates=True)
         await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
     finally:
+        # Рассылка останавливается первой: после нее в буфер записи и
+        # планировщик отправки больше ничего не попадает
+        await sender.close()
+        await retention.close()
+        await send_scheduler.close()
+        await sent_writer.close()
+        await http_client.close()
+        if cache:
+            await cache.close()
+        if sent_filter:
+            await sent_filter.close()
         await bot.session.close()
         logger.info("Bot stopped!")
 
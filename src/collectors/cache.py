@@ -0,0 +1,187 @@
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from loguru import logger
+from typing import Dict, Optional, Tuple
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from params_generators.utils import make_query_key
+
+
+class ResponseCache(ABC):
+    """
+    Базовый кеш ответов API с подсчетом попаданий и промахов.
+    Ключ строится по нормализованным параметрам запроса (включая страницу).
+    Дочерние классы должны определить способ хранения данных.
+
+    Args:
+        ttl (int): Время жизни записи (сек).
+    """
+
+    def __init__(self, ttl: int) -> None:
+        self.ttl = ttl
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @staticmethod
+    def make_key(params: Dict) -> str:
+        """
+        Формирует строковый ключ кеша из параметров запроса.
+
+        Args:
+            params (Dict): Параметры запроса.
+
+        Returns:
+            str: Ключ кеша.
+        """
+        return "hh:vacancies:" + json.dumps(make_query_key(params), ensure_ascii=False)
+
+    async def get(self, params: Dict) -> Optional[Dict]:
+        """
+        Получает ответ из кеша.
+
+        Args:
+            params (Dict): Параметры запроса.
+
+        Returns:
+            Optional[Dict]: Сохраненный ответ или None, если его нет.
+        """
+        value = await self._get(self.make_key(params))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, params: Dict, value: Dict) -> None:
+        """
+        Сохраняет ответ в кеш.
+
+        Args:
+            params (Dict): Параметры запроса.
+            value (Dict): Ответ API.
+        """
+        await self._set(self.make_key(params), value)
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Статистика использования кеша.
+
+        Returns:
+            Dict[str, float]: Количество попаданий, промахов и доля попаданий.
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+    async def close(self) -> None:
+        """
+        Освобождает ресурсы кеша.
+        """
+        pass
+
+    @abstractmethod
+    async def _get(self, key: str) -> Optional[Dict]:
+        """
+        Метод для получения значения по ключу.
+        """
+        pass
+
+    @abstractmethod
+    async def _set(self, key: str, value: Dict) -> None:
+        """
+        Метод для сохранения значения по ключу.
+        """
+        pass
+
+
+class MemoryResponseCache(ResponseCache):
+    """
+    LRU-кеш ответов в памяти процесса с ограничением размера и TTL.
+
+    Args:
+        ttl (int): Время жизни записи (сек).
+        max_size (int): Максимальное количество записей.
+    """
+
+    def __init__(self, ttl: int, max_size: int = 1000) -> None:
+        super().__init__(ttl)
+        self.max_size = max_size
+        self._data: OrderedDict[str, Tuple[float, Dict]] = OrderedDict()
+
+    async def _get(self, key: str) -> Optional[Dict]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def _set(self, key: str, value: Dict) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+
+class RedisResponseCache(ResponseCache):
+    """
+    Кеш ответов в Redis. Позволяет разделять кеш между несколькими экземплярами бота.
+    Ошибки Redis не прерывают сбор вакансий и считаются промахом.
+
+    Args:
+        ttl (int): Время жизни записи (сек).
+        url (str): Адрес Redis.
+    """
+
+    def __init__(self, ttl: int, url: str) -> None:
+        super().__init__(ttl)
+        self.redis = Redis.from_url(url)
+
+    async def _get(self, key: str) -> Optional[Dict]:
+        try:
+            value = await self.redis.get(key)
+        except RedisError as e:
+            logger.error(f"Ошибка при чтении кеша из Redis: {e}")
+            return None
+        return json.loads(value) if value else None
+
+    async def _set(self, key: str, value: Dict) -> None:
+        try:
+            await self.redis.set(key, json.dumps(value, ensure_ascii=False), ex=self.ttl)
+        except RedisError as e:
+            logger.error(f"Ошибка при записи кеша в Redis: {e}")
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+
+def create_response_cache(backend: str, ttl: int, max_size: int, redis_url: str) -> Optional[ResponseCache]:
+    """
+    Создает кеш ответов по названию бэкенда.
+
+    Args:
+        backend (str): "memory", "redis" или "none".
+        ttl (int): Время жизни записи (сек).
+        max_size (int): Максимальное количество записей (для памяти).
+        redis_url (str): Адрес Redis (для Redis).
+
+    Returns:
+        Optional[ResponseCache]: Кеш или None, если кеширование отключено.
+    """
+    if backend == "memory":
+        return MemoryResponseCache(ttl, max_size)
+    if backend == "redis":
+        return RedisResponseCache(ttl, redis_url)
+    if backend == "none":
+        return None
+    raise ValueError(f"Неизвестный бэкенд кеша: {backend}")
@@ -1,6 +1,77 @@
+import asyncio
 import aiohttp
+from datetime import datetime
+from sys import intern
 from loguru import logger
-from typing import List, Dict, Optional, Union
+from typing import AsyncIterator, List, Dict, NamedTuple, Optional, Tuple
+
+from collectors.cache import ResponseCache
+from collectors.http_client import HttpClient
+from collectors.rate_limiter import RateLimiter, RetryableResponseError
+from params_generators.utils import parse_date
+
+
+class VacancyHeadhunter(NamedTuple):
+    """
+    Неизменяемая компактная запись вакансии HeadHunter.
+    Повторяющиеся строки (локация, работодатель, валюта) интернируются.
+    """
+    id: Optional[str]
+    name: Optional[str]
+    salary_from: Optional[int]
+    salary_to: Optional[int]
+    salary_currency: Optional[str]
+    location: Optional[str]
+    employer: Optional[str]
+    link: Optional[str]
+    description: str
+    responsibility: str
+    published_at: Optional[datetime]
+    experience: Optional[str]
+    professional_roles: Tuple[str, ...]
+
+    @classmethod
+    def from_api(cls, item: Dict) -> "VacancyHeadhunter":
+        """
+        Создает запись из элемента ответа API.
+
+        Args:
+            item (Dict): Вакансия из поля 'items' ответа API.
+
+        Returns:
+            VacancyHeadhunter: Запись вакансии.
+        """
+        salary = item.get("salary")
+        area = item.get("area")
+        employer = item.get("employer")
+        snippet = item.get("snippet") or {}
+        if salary:
+            salary_from, salary_to = salary.get("from"), salary.get("to")
+            currency = salary.get("currency")
+            currency = intern(currency) if currency else currency
+        else:
+            salary_from = salary_to = currency = None
+        location = area.get("name") if area else None
+        employer_name = employer.get("name") if employer else None
+        experience = item.get("experience")
+        experience_id = experience.get("id") if experience else None
+        # tuple.__new__ вместо cls(...) — без разбора именованных аргументов
+        return tuple.__new__(cls, (
+            item.get("id"),
+            item.get("name"),
+            salary_from,
+            salary_to,
+            currency,
+            intern(location) if location else location,
+            intern(employer_name) if employer_name else employer_name,
+            item.get("alternate_url"),
+            snippet.get("requirement", ""),
+            snippet.get("responsibility", ""),
+            parse_date(item.get("published_at")),
+            intern(experience_id) if experience_id else experience_id,
+            tuple(intern(role["id"])
+                  for role in item.get("professional_roles") or ()),
+        ))
 
 
 class HeadhunterVacanciesParser:
@@ -10,14 +81,63 @@ class HeadhunterVacanciesParser:
     Args:
         params (Optional[Dict[str, str]]): Параметры запроса к API.
         per_page (int): Количество вакансий на странице (пагинация).
+        max_concurrent_pages (int): Максимальное число одновременно загружаемых страниц.
+        http_client (Optional[HttpClient]): Общий HTTP-клиент. Если не передан,
+            на время обхода страниц создается отдельная сессия.
+        cache (Optional[ResponseCache]): Кеш ответов API. Если не передан, ответы не кешируются.
+        rate_limiter (Optional[RateLimiter]): Общий ограничитель запросов к API.
+
+    После обхода в found хранится общее число найденных API вакансий,
+    в pages_fetched — число страниц, запрошенных у API (без ответов из кеша), а complete показывает,
+    что выдача получена до конца (обход не прерван ошибкой или потребителем).
     """
 
-    def __init__(self, params: Optional[Dict[str, str]] = None, per_page: int = 20) -> None:
+    _RETRY_STATUSES = (429, 502, 503, 504)
+
+    def __init__(
+        self,
+        params: Optional[Dict[str, str]] = None,
+        per_page: int = 20,
+        max_concurrent_pages: int = 5,
+        http_client: Optional[HttpClient] = None,
+        cache: Optional[ResponseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ) -> None:
         self.base_url: str = "https://api.hh.ru/vacancies"
         self.params: Dict[str, str] = params or {}
         self.per_page: int = per_page
+        self.max_concurrent_pages: int = max_concurrent_pages
+        self.http_client: Optional[HttpClient] = http_client
+        self.cache: Optional[ResponseCache] = cache
+        self.rate_limiter: Optional[RateLimiter] = rate_limiter
+        self.found: int = 0
+        self.pages_fetched: int = 0
+        self.complete: bool = False
+
+    async def _request(self, session: aiohttp.ClientSession, params: Dict) -> Dict:
+        """
+        Выполнить один запрос к API.
+
+        Args:
+            session (aiohttp.ClientSession): Асинхронная сессия для HTTP запросов.
+            params (Dict): Параметры запроса.
 
-    async def get_vacancies(self, session: aiohttp.ClientSession, page: int = 0) -> Optional[Dict]:
+        Raises:
+            RetryableResponseError: Если API вернул код, после которого запрос нужно повторить.
+
+        Returns:
+            Dict: Ответ API.
+        """
+        async with session.get(self.base_url, params=params) as response:
+            if response.status in self._RETRY_STATUSES:
+                raise RetryableResponseError(
+                    response.status, response.headers.get("Retry-After"))
+            response.raise_for_status()
+            logger.debug(
+                f"Запрос выполнен успешно. Код ответа: {response.status}")
+            return await response.json()
+
+    async def get_vacancies(self, session: aiohttp.ClientSession, page: int = 0) -> Dict:
         """
         Получить данные о вакансиях с конкретной страницы.
 
@@ -25,23 +145,39 @@ class HeadhunterVacanciesParser:
             session (aiohttp.ClientSession): Асинхронная сессия для HTTP запросов.
             page (int): Номер страницы для пагинации.
 
+        Raises:
+            CircuitOpenError: Если запросы к API приостановлены ограничителем.
+            RetryableResponseError | aiohttp.ClientError | asyncio.TimeoutError:
+                Если страницу не удалось получить (после всех повторов). Ошибка
+                не подменяется пустым ответом, чтобы недоступность API не
+                выглядела как отсутствие вакансий.
+
         Returns:
-            Optional[Dict]: Словарь с ответом API или None при ошибке.
+            Dict: Словарь с ответом API.
         """
         params = self.params.copy()
         params["page"] = page
         params["per_page"] = self.per_page
+        if self.cache:
+            cached_data = await self.cache.get(params)
+            if cached_data is not None:
+                logger.debug(f"Страница {page} получена из кеша")
+                return cached_data
+        # Считаются только запросы к API, без ответов из кеша
+        self.pages_fetched += 1
         try:
             logger.debug(
                 f"Отправка запроса на получение вакансий, страница {page}")
-            async with session.get(self.base_url, params=params) as response:
-                response.raise_for_status()
-                logger.debug(
-                    f"Запрос выполнен успешно. Код ответа: {response.status}")
-                return await response.json()
-        except aiohttp.ClientError as e:
+            if self.rate_limiter:
+                vacancies_data = await self.rate_limiter.call(lambda: self._request(session, params))
+            else:
+                vacancies_data = await self._request(session, params)
+        except (aiohttp.ClientError, asyncio.TimeoutError, RetryableResponseError) as e:
             logger.error(f"Ошибка при запросе данных на странице {page}: {e}")
-            return None
+            raise
+        if self.cache:
+            await self.cache.set(params, vacancies_data)
+        return vacancies_data
 
     async def get_pages(self, session: aiohttp.ClientSession) -> int:
         """
@@ -54,6 +190,18 @@ class HeadhunterVacanciesParser:
             int: Количество страниц.
         """
         vacancies_data = await self.get_vacancies(session, page=0)
+        return self._get_pages_from_data(vacancies_data)
+
+    def _get_pages_from_data(self, vacancies_data: Optional[Dict]) -> int:
+        """
+        Получить количество страниц из уже загруженного ответа API.
+
+        Args:
+            vacancies_data (Optional[Dict]): Данные ответа API.
+
+        Returns:
+            int: Количество страниц.
+        """
         if vacancies_data and "pages" in vacancies_data:
             logger.debug(
                 f"Количество страниц с вакансиями: {vacancies_data['pages']}")
@@ -61,7 +209,7 @@ class HeadhunterVacanciesParser:
         logger.debug("Не удалось получить данные о страницах.")
         return 0
 
-    def parse_vacancies(self, vacancies_data: Dict) -> List[Dict[str, Optional[Union[str, int]]]]:
+    def parse_vacancies(self, vacancies_data: Dict) -> List[VacancyHeadhunter]:
         """
         Распарсить вакансии из ответа API.
 
@@ -69,7 +217,7 @@ class HeadhunterVacanciesParser:
             vacancies_data (Dict): Данные ответа API.
 
         Returns:
-            List[Dict[str, Optional[Union[str, int]]]]: Список вакансий с нужными полями.
+            List[VacancyHeadhunter]: Список вакансий с нужными полями.
         """
         if not vacancies_data:
             logger.debug("Отсутствуют данные для парсинга.")
@@ -77,57 +225,104 @@ class HeadhunterVacanciesParser:
 
         items = vacancies_data.get("items", [])
         logger.debug(f"Парсинг {len(items)} вакансий.")
-        vacancies: List[Dict[str, Optional[Union[str, int]]]] = []
-
-        for vacancy in items:
-            salary = vacancy.get("salary")
-            snippet = vacancy.get("snippet", {})
-            vac_info = {
-                "id": vacancy.get("id"),
-                "name": vacancy.get("name"),
-                "salary_from": salary.get("from") if salary else None,
-                "salary_to": salary.get("to") if salary else None,
-                "salary_currency": salary.get("currency") if salary else None,
-                "location": vacancy.get("area", {}).get("name") if vacancy.get("area") else None,
-                "employer": vacancy.get("employer", {}).get("name") if vacancy.get("employer") else None,
-                "link": vacancy.get("alternate_url"),
-                "description": snippet.get("requirement", ""),
-                "responsibility": snippet.get("responsibility", ""),
-            }
-            vacancies.append(vac_info)
+        vacancies = [VacancyHeadhunter.from_api(item) for item in items]
 
         logger.debug(f"Парсинг завершен. Найдено {len(vacancies)} вакансий.")
         return vacancies
 
-    async def get_all_vacancies(self) -> List[Dict[str, Optional[Union[str, int]]]]:
+    async def _get_vacancies_limited(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, page: int) -> Dict:
         """
-        Получить все вакансии, обходя все страницы.
+        Получить страницу вакансий с ограничением числа одновременных запросов.
+
+        Args:
+            session (aiohttp.ClientSession): Асинхронная сессия.
+            semaphore (asyncio.Semaphore): Ограничитель одновременных запросов.
+            page (int): Номер страницы.
 
         Returns:
-            List[Dict[str, Optional[Union[str, int]]]]: Полный список вакансий.
+            Dict: Словарь с ответом API.
         """
+        async with semaphore:
+            return await self.get_vacancies(session, page)
+
+    async def iter_vacancies(self) -> AsyncIterator[VacancyHeadhunter]:
+        """
+        Получать вакансии постранично по мере загрузки страниц.
+
+        Yields:
+            VacancyHeadhunter: Очередная вакансия в порядке страниц.
+        """
+        if self.http_client:
+            async for vacancy in self._iter_vacancies(self.http_client.session):
+                yield vacancy
+            return
         async with aiohttp.ClientSession() as session:
-            pages = await self.get_pages(session)
-            all_vacancies: List[Dict[str, Optional[Union[str, int]]]] = []
-            logger.debug(
-                f"Начало получения всех вакансий. Всего страниц: {pages}")
+            async for vacancy in self._iter_vacancies(session):
+                yield vacancy
 
-            for page in range(pages):
-                logger.debug(f"Получение вакансий с страницы {page}")
-                vacancies_data = await self.get_vacancies(session, page)
+    async def _iter_vacancies(self, session: aiohttp.ClientSession) -> AsyncIterator[VacancyHeadhunter]:
+        """
+        Получать вакансии в рамках переданной сессии.
+        Первая страница загружается один раз и используется для определения
+        количества страниц, остальные загружаются параллельно, но отдаются
+        строго по порядку страниц.
+
+        Args:
+            session (aiohttp.ClientSession): Асинхронная сессия.
+
+        Raises:
+            Exception: Ошибка загрузки любой из страниц прерывает обход.
+
+        Yields:
+            VacancyHeadhunter: Очередная вакансия.
+        """
+        self.complete = False
+        first_page_data = await self.get_vacancies(session, page=0)
+        pages = self._get_pages_from_data(first_page_data)
+        self.found = first_page_data.get("found", 0) if first_page_data else 0
+        logger.debug(
+            f"Начало получения всех вакансий. Всего страниц: {pages}")
+
+        tasks: List[asyncio.Task] = []
+        first_page_items = first_page_data.get("items", []) if first_page_data else []
+        if pages > 1 and len(first_page_items) >= self.per_page:
+            semaphore = asyncio.Semaphore(self.max_concurrent_pages)
+            tasks = [
+                asyncio.create_task(
+                    self._get_vacancies_limited(session, semaphore, page))
+                for page in range(1, pages)
+            ]
+
+        count = 0
+        try:
+            for page in range(1 + len(tasks) if pages else 0):
+                vacancies_data = first_page_data if page == 0 else await tasks[page - 1]
                 if not vacancies_data or not vacancies_data.get("items"):
                     logger.debug(
                         f"Нет вакансий на странице {page}, завершение парсинга.")
                     break
 
-                parsed_vacancies = self.parse_vacancies(vacancies_data)
-                all_vacancies.extend(parsed_vacancies)
+                for vacancy in self.parse_vacancies(vacancies_data):
+                    count += 1
+                    yield vacancy
 
                 if len(vacancies_data["items"]) < self.per_page:
                     logger.debug(
                         f"Количество вакансий на странице {page} меньше {self.per_page}, завершение парсинга.")
                     break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-            logger.debug(
-                f"Общее количество полученных вакансий: {len(all_vacancies)}")
-            return all_vacancies
+        self.complete = True
+        logger.debug(f"Общее количество полученных вакансий: {count}")
+
+    async def get_all_vacancies(self) -> List[VacancyHeadhunter]:
+        """
+        Получить все вакансии, обходя все страницы.
+
+        Returns:
+            List[VacancyHeadhunter]: Полный список вакансий.
+        """
+        return [vacancy async for vacancy in self.iter_vacancies()]
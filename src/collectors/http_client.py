@@ -0,0 +1,90 @@
+import aiohttp
+from loguru import logger
+from types import SimpleNamespace
+from typing import Dict, Optional
+
+
+class HttpClient:
+    """
+    Общий HTTP-клиент с пулом соединений для всех коллекторов.
+    Создается один раз в bot.py и закрывается при остановке бота.
+
+    Args:
+        limit (int): Максимальное число соединений в пуле.
+        limit_per_host (int): Максимальное число соединений к одному хосту.
+        ttl_dns_cache (int): Время жизни DNS-кеша (сек).
+        keepalive_timeout (float): Время удержания простаивающего соединения (сек).
+        timeout (float): Общий таймаут одного запроса (сек).
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 20,
+        ttl_dns_cache: int = 300,
+        keepalive_timeout: float = 30,
+        timeout: float = 30,
+    ) -> None:
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.ttl_dns_cache = ttl_dns_cache
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self.connections_created: int = 0
+        self.connections_reused: int = 0
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        Сессия aiohttp, создается при первом обращении.
+
+        Returns:
+            aiohttp.ClientSession: Общая сессия с пулом соединений.
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.ttl_dns_cache,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_connection_create_end.append(
+                self._on_connection_create)
+            trace_config.on_connection_reuseconn.append(
+                self._on_connection_reuse)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_configs=[trace_config],
+            )
+            logger.info("HTTP-клиент создан")
+        return self._session
+
+    async def _on_connection_create(self, session: aiohttp.ClientSession, context: SimpleNamespace, params) -> None:
+        self.connections_created += 1
+
+    async def _on_connection_reuse(self, session: aiohttp.ClientSession, context: SimpleNamespace, params) -> None:
+        self.connections_reused += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Статистика использования пула соединений.
+
+        Returns:
+            Dict[str, int]: Количество созданных и переиспользованных соединений.
+        """
+        return {
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+        }
+
+    async def close(self) -> None:
+        """
+        Закрывает сессию и все соединения пула.
+        """
+        if self._session and not self._session.closed:
+            await self._session.close()
+            logger.info(f"HTTP-клиент закрыт. Статистика: {self.get_stats()}")
+        self._session = None
@@ -0,0 +1,409 @@
+import asyncio
+import math
+from collections import defaultdict
+from contextlib import aclosing
+from datetime import datetime
+from loguru import logger
+from typing import FrozenSet, List, Dict, Set, Tuple, Optional, Union
+
+from collectors.cache import ResponseCache
+from collectors.headhunter import HeadhunterVacanciesParser
+from collectors.http_client import HttpClient
+from collectors.rate_limiter import RateLimiter, CircuitOpenError
+from collectors.subscription_index import (
+    MERGEABLE_PARAMS, SubscriptionIndex, to_set, get_scope
+)
+from params_generators.headhunter import ParamsGeneratorHeadhunter
+from params_generators.utils import make_query_key, make_query_id
+from settings import HH_MAX_CONCURRENT_PAGES, HH_PER_PAGE
+
+
+def _from_set(values: Optional[FrozenSet[str]]) -> Optional[Union[str, List[str]]]:
+    """
+    Приводит множество значений к виду параметра запроса (как в merge_dicts).
+    """
+    if values is None:
+        return None
+    values = sorted(values)
+    return values[0] if len(values) == 1 else values
+
+
+class BaseQuery:
+    """
+    Запрос пользователей до объединения.
+
+    Args:
+        params (Dict): Параметры запроса без даты.
+    """
+
+    __slots__ = ("params", "key", "query_id", "scope", "roles",
+                 "experiences", "salary", "date", "subscribers")
+
+    def __init__(self, params: Dict) -> None:
+        self.params = params
+        self.key = make_query_key(params)
+        self.query_id = make_query_id(params)
+        self.scope = get_scope(params)
+        self.roles = to_set(params.get("professional_role"))
+        self.experiences = to_set(params.get("experience"))
+        self.salary = params.get("salary")
+        self.date: Optional[datetime] = None
+        self.subscribers: Set[int] = set()
+
+
+def merge_queries(queries: List[BaseQuery]) -> Dict:
+    """
+    Формирует параметры объединенного запроса, покрывающего все переданные запросы
+    одной области: специальности и опыт объединяются, зарплата берется минимальная.
+
+    Args:
+        queries (List[BaseQuery]): Запросы одной области.
+
+    Returns:
+        Dict: Параметры объединенного запроса без даты.
+    """
+    if len(queries) == 1:
+        return queries[0].params
+
+    params = {name: value for name, value in queries[0].params.items()
+              if name not in MERGEABLE_PARAMS}
+    roles = [query.roles for query in queries]
+    if None not in roles:
+        params["professional_role"] = _from_set(frozenset().union(*roles))
+    experiences = [query.experiences for query in queries]
+    if None not in experiences:
+        params["experience"] = _from_set(frozenset().union(*experiences))
+    salaries = [query.salary for query in queries]
+    if None not in salaries:
+        params["salary"] = min(salaries)
+    return params
+
+
+class HeadhunterQueryPlanner:
+    """
+    Планировщик запросов к HeadHunter в рамках одного цикла рассылки.
+
+    Получает все подписки цикла, группирует пользователей по каноническому
+    ключу параметров поиска и объединяет запросы одной локации в запросы-надмножества
+    (специальности и опыт объединяются, зарплата берется минимальная), чтобы
+    сократить общее число страниц. Вакансии из объединенного запроса раздаются
+    по мере загрузки страниц подписчикам, найденным по индексу подписок.
+
+    Запросы группируются жадно (first fit decreasing) по оценке числа вакансий
+    из прошлого цикла так, чтобы объединенный запрос не превышал лимит выдачи API.
+    Если лимит все же превышен, в следующем цикле такие запросы выполняются отдельно.
+
+    Найденные вакансии вместе с подписчиками передаются в общую ограниченную
+    очередь следующей стадии: если она не успевает, запросы притормаживаются.
+    После завершения группы в очередь передается пара (None, подписчики группы),
+    чтобы следующая стадия обработала их вакансии, не дожидаясь конца цикла.
+
+    Для каждого запроса запоминается дата публикации самой свежей найденной
+    вакансии (отметка), чтобы в следующем цикле запрашивать только новое.
+
+    Args:
+        date (datetime): Дата, с которой ищутся вакансии по запросам без отметки.
+        http_client (HttpClient): Общий HTTP-клиент для запросов.
+        cache (Optional[ResponseCache]): Кеш ответов HeadHunter.
+        rate_limiter (Optional[RateLimiter]): Общий ограничитель запросов к HeadHunter.
+        max_concurrent_queries (int): Максимальное число одновременных запросов.
+        per_page (int): Количество вакансий на странице.
+        max_results (int): Максимальное число вакансий, которое API отдает по одному запросу.
+        index (Optional[SubscriptionIndex]): Общий индекс подписок. Если не передан,
+            индекс строится по подпискам цикла.
+    """
+
+    def __init__(
+        self,
+        date: datetime,
+        http_client: HttpClient,
+        cache: Optional[ResponseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_concurrent_queries: int = 10,
+        per_page: int = HH_PER_PAGE,
+        max_results: int = 2000,
+        index: Optional[SubscriptionIndex] = None,
+    ) -> None:
+        self.date = date
+        self.http_client = http_client
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.per_page = per_page
+        self.max_results = max_results
+        self._own_index = index is None
+        self.index = SubscriptionIndex() if index is None else index
+        self.semaphore = asyncio.Semaphore(max_concurrent_queries)
+        self._queries: Dict[Tuple, BaseQuery] = {}
+        self._user_keys: Dict[int, List[Tuple]] = defaultdict(list)
+        self._output: Optional[asyncio.Queue] = None
+        self._dates: Dict[str, datetime] = {}
+        self._previous_watermarks: Dict[str, datetime] = {}
+        self._fresh: Dict[str, int] = {}
+        self._estimates: Dict[str, int] = {}
+        self._matched: Dict[str, int] = defaultdict(int)
+        self._watermarks: Dict[str, datetime] = {}
+        self._groups: List[List[BaseQuery]] = []
+        self._pages_fetched: int = 0
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def queries_count(self) -> int:
+        """Количество уникальных запросов пользователей в цикле."""
+        return len(self._queries)
+
+    @property
+    def subscriptions_count(self) -> int:
+        """Общее количество подписок пользователей на запросы."""
+        return sum(len(keys) for keys in self._user_keys.values())
+
+    @property
+    def query_ids(self) -> List[str]:
+        """Идентификаторы уникальных запросов пользователей."""
+        return [query.query_id for query in self._queries.values()]
+
+    def subscribe(self, telegram_id: int, params_list: List[Dict]) -> None:
+        """
+        Регистрирует запросы пользователя в плане цикла.
+
+        Args:
+            telegram_id (int): Telegram ID пользователя.
+            params_list (List[Dict]): Параметры поиска пользователя (без даты).
+        """
+        if self._own_index:
+            self.index.subscribe(telegram_id, params_list)
+        for params in params_list:
+            key = make_query_key(params)
+            query = self._queries.get(key)
+            if query is None:
+                query = self._queries[key] = BaseQuery(params)
+            if telegram_id not in query.subscribers:
+                query.subscribers.add(telegram_id)
+                self._user_keys[telegram_id].append(key)
+
+    def set_dates(self, dates: Dict[str, datetime]) -> None:
+        """
+        Задает даты, с которых ищутся вакансии по отдельным запросам.
+
+        Args:
+            dates (Dict[str, datetime]): Дата по идентификатору запроса.
+        """
+        self._dates = dates
+
+    def set_watermarks(self, watermarks: Dict[str, datetime]) -> None:
+        """
+        Задает отметки прошлых опросов, чтобы отличать новые вакансии от
+        повторно полученных из перекрытия.
+
+        Args:
+            watermarks (Dict[str, datetime]): Отметка по идентификатору запроса.
+        """
+        self._previous_watermarks = watermarks
+
+    def get_fresh_counts(self) -> Dict[str, int]:
+        """
+        Число вакансий, опубликованных после прошлой отметки, по успешно
+        выполненным запросам (для подстройки частоты опроса).
+
+        Returns:
+            Dict[str, int]: Количество новых вакансий по идентификатору запроса.
+        """
+        return self._fresh
+
+    def set_estimates(self, estimates: Dict[str, int]) -> None:
+        """
+        Задает оценки числа вакансий по запросам (из прошлого цикла).
+
+        Args:
+            estimates (Dict[str, int]): Оценка по идентификатору запроса.
+        """
+        self._estimates = estimates
+
+    def get_estimates(self) -> Dict[str, int]:
+        """
+        Оценки числа вакансий по успешно выполненным запросам для следующего
+        цикла. Для запросов, завершившихся ошибкой, оценка не возвращается,
+        чтобы недоступность API не сбрасывала ее в ноль.
+
+        Returns:
+            Dict[str, int]: Оценка по идентификатору запроса.
+        """
+        return dict(self._matched)
+
+    def get_watermarks(self) -> Dict[str, datetime]:
+        """
+        Даты публикации самых свежих вакансий по полностью выполненным запросам.
+
+        Returns:
+            Dict[str, datetime]: Отметка по идентификатору запроса.
+        """
+        return self._watermarks
+
+    def _estimate_pages(self, results: int) -> int:
+        """
+        Оценка количества страниц для заданного числа вакансий.
+        """
+        return max(1, math.ceil(results / self.per_page))
+
+    def _plan(self) -> List[List[BaseQuery]]:
+        """
+        Объединяет запросы одной области в группы, каждая из которых
+        выполняется одним запросом к API.
+
+        Returns:
+            List[List[BaseQuery]]: Группы запросов.
+        """
+        scopes: Dict[Tuple, List[BaseQuery]] = defaultdict(list)
+        for query in self._queries.values():
+            scopes[query.scope].append(query)
+
+        groups: List[List[BaseQuery]] = []
+        for queries in scopes.values():
+            queries.sort(key=lambda query: self._estimates.get(
+                query.query_id, 0), reverse=True)
+            scope_groups: List[Tuple[int, List[BaseQuery]]] = []
+            for query in queries:
+                estimate = self._estimates.get(query.query_id, 0)
+                for i, (total, group) in enumerate(scope_groups):
+                    if total + estimate <= self.max_results:
+                        group.append(query)
+                        scope_groups[i] = (total + estimate, group)
+                        break
+                else:
+                    scope_groups.append((estimate, [query]))
+            groups.extend(group for _, group in scope_groups)
+        return groups
+
+    async def _run_group(self, queries: List[BaseQuery]) -> None:
+        """
+        Выполняет объединенный запрос и раздает вакансии подписчикам.
+        Отметки, оценки и число новых вакансий обновляются только если запрос
+        выполнен полностью: ошибка загрузки страницы прерывает группу.
+
+        Пользователю не отправляются вакансии старше дат его запросов.
+        Оценка числа вакансий по запросу в объединенной группе — наименьшее
+        число вакансий, полученных его подписчиками (оценка сверху).
+
+        Args:
+            queries (List[BaseQuery]): Группа запросов.
+        """
+        date = min(query.date for query in queries)
+        params = ParamsGeneratorHeadhunter().add_date(merge_queries(queries), date)
+        merged = len(queries) > 1
+        recipients = set().union(*(query.subscribers for query in queries))
+        scope = queries[0].scope
+        dates: Dict[int, datetime] = {}
+        for query in queries:
+            for telegram_id in query.subscribers:
+                dates[telegram_id] = min(dates.get(telegram_id, query.date), query.date)
+        received: Dict[int, int] = defaultdict(int)
+        fresh: Dict[int, int] = defaultdict(int)
+        fresh_since = max((self._previous_watermarks[query.query_id] for query in queries
+                           if query.query_id in self._previous_watermarks), default=None)
+        count = 0
+        fresh_count = 0
+        watermark = None
+        parser = HeadhunterVacanciesParser(
+            params=params,
+            per_page=self.per_page,
+            max_concurrent_pages=HH_MAX_CONCURRENT_PAGES,
+            http_client=self.http_client,
+            cache=self.cache,
+            rate_limiter=self.rate_limiter)
+        try:
+            async with self.semaphore:
+                async with aclosing(parser.iter_vacancies()) as vacancies:
+                    async for vacancy in vacancies:
+                        count += 1
+                        is_fresh = fresh_since is None or not vacancy.published_at or \
+                            vacancy.published_at > fresh_since
+                        fresh_count += is_fresh
+                        if vacancy.published_at and (watermark is None or vacancy.published_at > watermark):
+                            watermark = vacancy.published_at
+                        if merged:
+                            subscribers = [
+                                telegram_id for telegram_id in self.index.match(vacancy, scope) & recipients
+                                if not vacancy.published_at or vacancy.published_at >= dates[telegram_id]
+                            ]
+                        else:
+                            subscribers = recipients
+                        if subscribers:
+                            for telegram_id in subscribers:
+                                received[telegram_id] += 1
+                                fresh[telegram_id] += is_fresh
+                            await self._output.put((vacancy, subscribers))
+            if not parser.complete:
+                logger.warning(
+                    f"Выдача получена не полностью, отметки запросов не обновлены: {params}")
+                return
+            for query in queries:
+                self._matched[query.query_id] = count if not merged else min(
+                    received[telegram_id] for telegram_id in query.subscribers)
+                self._fresh[query.query_id] = fresh_count if not merged else min(
+                    fresh[telegram_id] for telegram_id in query.subscribers)
+            if merged and parser.found > self.max_results:
+                logger.warning(
+                    f"Объединенный запрос превысил лимит выдачи ({parser.found}), в следующем цикле он будет разделен: {params}")
+                for query in queries:
+                    self._matched[query.query_id] = self.max_results
+            elif watermark:
+                for query in queries:
+                    self._watermarks[query.query_id] = watermark
+            logger.info(
+                f"Найдено {count} вакансий для {len(recipients)} подписчиков ({len(queries)} запросов) по параметрам: {params}")
+        except CircuitOpenError:
+            logger.warning(
+                f"Запрос прерван, HeadHunter недоступен: {params}")
+        except Exception as e:
+            logger.error(f"Ошибка при выполнении запроса {params}: {e}")
+        finally:
+            self._pages_fetched += parser.pages_fetched
+            await self._output.put((None, recipients))
+
+    def start(self, output: asyncio.Queue) -> None:
+        """
+        Планирует и запускает все запросы цикла в фоне.
+
+        Args:
+            output (asyncio.Queue): Очередь, в которую передаются пары
+                (вакансия, Telegram ID подписчиков) и (None, Telegram ID
+                подписчиков) после завершения группы запросов.
+        """
+        self._output = output
+        if self.rate_limiter and self.rate_limiter.breaker.is_open:
+            logger.warning(
+                "HeadHunter недоступен, сбор вакансий в этом цикле пропущен")
+            return
+        for query in self._queries.values():
+            query.date = self._dates.get(query.query_id, self.date)
+        self._groups = self._plan()
+        logger.info(
+            f"Уникальных запросов: {self.queries_count}, объединенных запросов: {len(self._groups)}, подписок: {self.subscriptions_count}")
+        self._tasks = [asyncio.create_task(self._run_group(group))
+                       for group in self._groups]
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Статистика запросов цикла: сколько страниц запрошено у API (без ответов
+        из кеша) и сколько потребовалось бы без объединения запросов (по числу
+        найденных вакансий).
+
+        Returns:
+            Dict[str, int]: Статистика запросов.
+        """
+        pages_without_merge = sum(
+            self._estimate_pages(self._matched.get(query.query_id, 0))
+            for group in self._groups for query in group)
+        return {
+            "queries": self.queries_count,
+            "merged_queries": len(self._groups),
+            "pages_fetched": self._pages_fetched,
+            "pages_without_merge": pages_without_merge,
+            "pages_saved": pages_without_merge - self._pages_fetched,
+        }
+
+    async def wait(self) -> None:
+        """
+        Ожидает завершения всех запросов цикла.
+        """
+        await asyncio.gather(*self._tasks)
+        logger.info(f"Статистика запросов к HeadHunter: {self.get_stats()}")
@@ -0,0 +1,222 @@
+import hashlib
+import heapq
+import math
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class QueryScheduler:
+    """
+    Расписание опроса запросов HeadHunter.
+
+    Каждый запрос опрашивается раз в interval секунд, но не все одновременно:
+    момент опроса внутри интервала (слот) вычисляется по хешу ключа группы.
+    Запросы одной группы (одной локации) попадают в один слот и по-прежнему
+    объединяются планировщиком, а разные группы распределяются по интервалу
+    равномерно, поэтому нагрузка на HeadHunter, базу и Telegram не идет всплесками.
+
+    Частота опроса подстраивается под каждый запрос: по числу новых вакансий
+    за опрос оценивается (экспоненциальным сглаживанием) скорость их появления,
+    и интервал выбирается так, чтобы за опрос в среднем появлялось
+    target_found вакансий. Интервал — степень двойки от interval, не больше
+    max_interval: тихие запросы опрашиваются реже, а частые — с базовым
+    интервалом. Слоты разных интервалов совпадают, поэтому запросы одной
+    локации все равно часто выполняются вместе.
+
+    Запросы хранятся в куче по времени следующего опроса. За один шаг
+    выбирается не больше max_per_tick просроченных запросов, начиная с самых
+    старых; не поместившиеся переносятся на следующий шаг. Задержка опроса
+    (насколько позже срока запрос был выполнен) учитывается по запросам.
+
+    Args:
+        interval (float): Базовый (минимальный) интервал опроса запроса (сек).
+        max_per_tick (int): Максимальное число запросов за один шаг.
+        max_interval (Optional[float]): Максимальный интервал опроса (сек).
+            По умолчанию равен interval (подстройка отключена).
+        target_found (float): Желаемое число новых вакансий за опрос.
+        smoothing (float): Вес последнего опроса при оценке скорости (0..1).
+    """
+
+    def __init__(
+        self,
+        interval: float = 10,
+        max_per_tick: int = 100,
+        max_interval: Optional[float] = None,
+        target_found: float = 1,
+        smoothing: float = 0.3,
+    ) -> None:
+        self.interval = interval
+        self.max_per_tick = max_per_tick
+        self.max_level = max(0, int(math.log2((max_interval or interval) / interval)))
+        self.target_found = target_found
+        self.smoothing = smoothing
+        self.polls: int = 0
+        self.carried_over: int = 0
+        self.max_lag: float = 0.0
+        self._heap: List[Tuple[float, str]] = []
+        self._due: Dict[str, float] = {}
+        self._groups: Dict[str, str] = {}
+        self._lags: Dict[str, float] = {}
+        self._levels: Dict[str, int] = {}
+        self._rates: Dict[str, float] = {}
+        self._polled_at: Dict[str, float] = {}
+        self._elapsed: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def _get_phase(self, group: str) -> float:
+        """
+        Смещение слота группы внутри интервала (по хешу ключа группы).
+        """
+        digest = hashlib.blake2b(group.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little") / 2 ** 64 * self.interval
+
+    def get_interval(self, query_id: str) -> float:
+        """
+        Текущий интервал опроса запроса (сек).
+        """
+        return self.interval * 2 ** self._levels.get(query_id, 0)
+
+    def _get_next_due(self, query_id: str, after: float) -> float:
+        """
+        Ближайшее время опроса запроса в его слоте позже after.
+        """
+        interval = self.get_interval(query_id)
+        phase = self._get_phase(self._groups[query_id])
+        periods = (after - phase) // interval + 1
+        return phase + periods * interval
+
+    def _push(self, query_id: str, due_at: float) -> None:
+        self._due[query_id] = due_at
+        heapq.heappush(self._heap, (due_at, query_id))
+
+    def sync(self, groups: Dict[str, str], now: Optional[float] = None) -> None:
+        """
+        Приводит расписание к актуальному набору запросов: новые запросы
+        ставятся в свой слот, удаленные убираются.
+
+        Args:
+            groups (Dict[str, str]): Ключ группы по идентификатору запроса.
+            now (Optional[float]): Текущее время (time.monotonic()).
+        """
+        now = time.monotonic() if now is None else now
+        for query_id in set(self._due) - set(groups):
+            del self._due[query_id]
+            for values in (self._groups, self._lags, self._levels, self._rates,
+                           self._polled_at, self._elapsed):
+                values.pop(query_id, None)
+        for query_id, group in groups.items():
+            if query_id not in self._due:
+                self._groups[query_id] = group
+                self._push(query_id, self._get_next_due(query_id, now))
+        # Записи удаленных и перенесенных запросов остаются в куче до извлечения
+        if len(self._heap) > 2 * len(self._due) + 1000:
+            self._heap = [(due_at, query_id) for query_id, due_at in self._due.items()]
+            heapq.heapify(self._heap)
+
+    def pop_due(self, now: Optional[float] = None) -> List[str]:
+        """
+        Выбирает запросы, время опроса которых наступило (не больше max_per_tick).
+        Выбранные запросы сразу переносятся на следующий интервал.
+
+        Args:
+            now (Optional[float]): Текущее время (time.monotonic()).
+
+        Returns:
+            List[str]: Идентификаторы запросов для опроса.
+        """
+        now = time.monotonic() if now is None else now
+        query_ids: List[str] = []
+        while self._heap and self._heap[0][0] <= now:
+            due_at, query_id = self._heap[0]
+            if self._due.get(query_id) != due_at:
+                heapq.heappop(self._heap)
+                continue
+            if len(query_ids) >= self.max_per_tick:
+                break
+            heapq.heappop(self._heap)
+            lag = now - due_at
+            self._lags[query_id] = lag
+            if query_id in self._polled_at:
+                self._elapsed[query_id] = now - self._polled_at[query_id]
+            self._polled_at[query_id] = now
+            self.max_lag = max(self.max_lag, lag)
+            query_ids.append(query_id)
+            self._push(query_id, self._get_next_due(query_id, now))
+        self.polls += len(query_ids)
+        self.carried_over += self.count_due(now)
+        return query_ids
+
+    def record(self, query_id: str, found: int) -> None:
+        """
+        Учитывает результат опроса и пересчитывает интервал запроса.
+        Первый опрос запроса не учитывается: его окно поиска не связано с интервалом.
+
+        Args:
+            query_id (str): Идентификатор запроса.
+            found (int): Число новых вакансий с прошлого опроса.
+        """
+        elapsed = self._elapsed.pop(query_id, None)
+        if query_id not in self._due or not elapsed:
+            return
+        rate = found / elapsed
+        if query_id in self._rates:
+            rate = self.smoothing * rate + (1 - self.smoothing) * self._rates[query_id]
+        self._rates[query_id] = rate
+        if rate > 0:
+            level = math.floor(math.log2(max(1.0, self.target_found / rate / self.interval)))
+        else:
+            level = self.max_level
+        level = min(level, self.max_level)
+        if level != self._levels.get(query_id, 0):
+            self._levels[query_id] = level
+            self._push(query_id, self._get_next_due(query_id, self._polled_at[query_id]))
+
+    def count_due(self, now: Optional[float] = None) -> int:
+        """
+        Количество запросов, время опроса которых уже наступило.
+        """
+        now = time.monotonic() if now is None else now
+        return sum(1 for due_at in self._due.values() if due_at <= now)
+
+    def get_seconds_to_next(self, now: Optional[float] = None) -> float:
+        """
+        Время до ближайшего опроса (сек).
+        """
+        now = time.monotonic() if now is None else now
+        if not self._due:
+            return self.interval
+        return max(0.0, min(self._due.values()) - now)
+
+    def get_lag(self, query_ids: Iterable[str]) -> float:
+        """
+        Наибольшая задержка последнего опроса среди запросов (например, запросов
+        одного пользователя).
+
+        Args:
+            query_ids (Iterable[str]): Идентификаторы запросов.
+
+        Returns:
+            float: Задержка (сек).
+        """
+        return max((self._lags.get(query_id, 0.0) for query_id in query_ids), default=0.0)
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Статистика расписания: запросов, опросов, переносов, задержка,
+        средний интервал опроса.
+
+        Returns:
+            Dict[str, float]: Статистика расписания.
+        """
+        lags = list(self._lags.values())
+        return {
+            "queries": len(self._due),
+            "polls": self.polls,
+            "carried_over": self.carried_over,
+            "avg_lag": round(sum(lags) / len(lags), 3) if lags else 0.0,
+            "max_lag": round(self.max_lag, 3),
+            "avg_interval": round(sum(self.get_interval(query_id) for query_id in self._due)
+                                  / len(self._due), 3) if self._due else 0.0,
+        }
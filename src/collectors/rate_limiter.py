@@ -0,0 +1,222 @@
+import asyncio
+import random
+import time
+import aiohttp
+from loguru import logger
+from typing import Awaitable, Callable, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+class RetryableResponseError(Exception):
+    """
+    Ответ API, после которого запрос нужно повторить (429, 5xx).
+
+    Args:
+        status (int): HTTP-код ответа.
+        retry_after (Optional[str]): Значение заголовка Retry-After.
+    """
+
+    def __init__(self, status: int, retry_after: Optional[str] = None) -> None:
+        super().__init__(f"Сервер вернул код {status}")
+        self.status = status
+        self.retry_after = self._parse_retry_after(retry_after)
+
+    @staticmethod
+    def _parse_retry_after(retry_after: Optional[str]) -> Optional[float]:
+        """
+        Преобразует заголовок Retry-After в секунды (поддерживается только числовой формат).
+        """
+        try:
+            return max(float(retry_after), 0.0) if retry_after else None
+        except ValueError:
+            return None
+
+
+class CircuitOpenError(Exception):
+    """
+    Запросы к API приостановлены: превышен порог ошибок подряд.
+    """
+    pass
+
+
+class TokenBucket:
+    """
+    Асинхронный token bucket: ограничивает среднее число операций в секунду.
+
+    Args:
+        rate (float): Количество токенов, добавляемых в секунду.
+        capacity (Optional[float]): Максимальный запас токенов (размер всплеска).
+            По умолчанию равен rate.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens +
+                           (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def pause(self, seconds: float) -> None:
+        """
+        Приостанавливает выдачу токенов на указанное время.
+
+        Args:
+            seconds (float): Длительность паузы (сек).
+        """
+        self._paused_until = max(self._paused_until,
+                                 time.monotonic() + seconds)
+
+    async def acquire(self) -> None:
+        """
+        Ожидает появления токена и забирает его.
+        """
+        async with self._lock:
+            while True:
+                pause = self._paused_until - time.monotonic()
+                if pause > 0:
+                    await asyncio.sleep(pause)
+                    continue
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class CircuitBreaker:
+    """
+    Размыкатель цепи: после серии ошибок подряд запросы приостанавливаются
+    на recovery_timeout, затем пропускаются пробные запросы.
+
+    Args:
+        failure_threshold (int): Количество ошибок подряд для размыкания.
+        recovery_timeout (float): Время паузы перед пробными запросами (сек).
+    """
+
+    def __init__(self, failure_threshold: int = 10, recovery_timeout: float = 60) -> None:
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failures: int = 0
+        self._opened_at: Optional[float] = None
+
+    @property
+    def is_open(self) -> bool:
+        """True, если запросы сейчас приостановлены."""
+        if self._opened_at is None:
+            return False
+        return time.monotonic() - self._opened_at < self.recovery_timeout
+
+    def record_success(self) -> None:
+        """
+        Фиксирует успешный запрос и замыкает цепь.
+        """
+        if self._opened_at is not None:
+            logger.info("Запросы к API возобновлены")
+        self.failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        """
+        Фиксирует ошибку запроса и размыкает цепь при превышении порога.
+        """
+        self.failures += 1
+        if self.failures >= self.failure_threshold and not self.is_open:
+            logger.warning(
+                f"Запросы к API приостановлены на {self.recovery_timeout} сек. после {self.failures} ошибок подряд")
+            self._opened_at = time.monotonic()
+
+
+class RateLimiter:
+    """
+    Общий ограничитель запросов к API: token bucket, повторы с экспоненциальной
+    задержкой и джиттером, учет Retry-After и размыкатель цепи.
+
+    Args:
+        rate (float): Допустимое число запросов в секунду.
+        max_retries (int): Максимальное число повторов одного запроса.
+        backoff_base (float): Базовая задержка перед повтором (сек).
+        backoff_max (float): Максимальная задержка перед повтором (сек).
+        failure_threshold (int): Количество ошибок подряд для размыкания цепи.
+        recovery_timeout (float): Длительность паузы после размыкания (сек).
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30,
+        failure_threshold: int = 10,
+        recovery_timeout: float = 60,
+    ) -> None:
+        self.bucket = TokenBucket(rate)
+        self.breaker = CircuitBreaker(failure_threshold, recovery_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def _get_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Задержка перед повтором: full jitter, но не меньше Retry-After.
+        """
+        delay = random.uniform(0, min(self.backoff_max,
+                                      self.backoff_base * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+    async def call(self, request: Callable[[], Awaitable[T]]) -> T:
+        """
+        Выполняет запрос с учетом ограничений и повторяет его при временных ошибках.
+
+        Args:
+            request (Callable[[], Awaitable[T]]): Функция, выполняющая один запрос.
+
+        Raises:
+            CircuitOpenError: Если запросы приостановлены.
+            RetryableResponseError | aiohttp.ClientError | asyncio.TimeoutError:
+                Если попытки исчерпаны.
+
+        Returns:
+            T: Результат запроса.
+        """
+        for attempt in range(self.max_retries + 1):
+            if self.breaker.is_open:
+                raise CircuitOpenError("Запросы к API приостановлены")
+            await self.bucket.acquire()
+            try:
+                result = await request()
+            except RetryableResponseError as e:
+                self.breaker.record_failure()
+                delay = self._get_delay(attempt, e.retry_after)
+                if e.status == 429:
+                    self.bucket.pause(delay)
+                error = e
+            except aiohttp.ClientResponseError as e:
+                if e.status < 500:
+                    raise
+                self.breaker.record_failure()
+                delay = self._get_delay(attempt)
+                error = e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.breaker.record_failure()
+                delay = self._get_delay(attempt)
+                error = e
+            else:
+                self.breaker.record_success()
+                return result
+
+            if attempt < self.max_retries:
+                logger.warning(
+                    f"Повтор запроса через {delay:.2f} сек. (попытка {attempt + 1}/{self.max_retries}): {error}")
+                await asyncio.sleep(delay)
+        raise error
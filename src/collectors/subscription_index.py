@@ -0,0 +1,247 @@
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from loguru import logger
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, Union
+
+from collectors.headhunter import VacancyHeadhunter
+from params_generators.headhunter import ParamsGeneratorHeadhunter
+from params_generators.utils import make_query_key
+
+
+# Параметры, по которым запросы можно объединять и проверять вакансии локально.
+# Остальные параметры (локация) образуют область объединения и должны совпадать.
+MERGEABLE_PARAMS = ("professional_role", "experience", "salary")
+
+
+def to_set(value: Optional[Union[str, List[str]]]) -> Optional[FrozenSet[str]]:
+    """
+    Приводит значение параметра к множеству строк (None — без ограничения).
+    """
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return frozenset(str(item) for item in value)
+    return frozenset([str(value)])
+
+
+def get_scope(params: Dict) -> Tuple:
+    """
+    Область запроса — канонический ключ параметров, которые нельзя проверить
+    по полям вакансии (локация, формат работы).
+
+    Args:
+        params (Dict): Параметры запроса без даты.
+
+    Returns:
+        Tuple: Ключ области.
+    """
+    return make_query_key(
+        {name: value for name, value in params.items() if name not in MERGEABLE_PARAMS})
+
+
+def get_salary_upper(vacancy: VacancyHeadhunter) -> Optional[int]:
+    """
+    Верхняя граница вилки в рублях или None, если зарплату проверить нельзя.
+    """
+    if vacancy.salary_currency not in (None, "RUR"):
+        return None
+    return vacancy.salary_to or vacancy.salary_from
+
+
+def salary_matches(vacancy: VacancyHeadhunter, salary: float) -> bool:
+    """
+    Проверяет вакансию на соответствие желаемой зарплате.
+    Вакансии без зарплаты и в другой валюте подходят (как и при поиске
+    HeadHunter без only_with_salary), иначе верхняя граница вилки должна
+    быть не ниже желаемой зарплаты.
+    """
+    upper = get_salary_upper(vacancy)
+    return upper is None or upper >= salary
+
+
+class SalaryBucket:
+    """
+    Пользователи с одинаковыми областью, специальностью и опытом,
+    отсортированные по желаемой зарплате.
+    """
+
+    __slots__ = ("salaries", "telegram_ids")
+
+    def __init__(self) -> None:
+        self.salaries: List[float] = []
+        self.telegram_ids: List[int] = []
+
+    def add(self, salary: float, telegram_id: int) -> None:
+        position = bisect_right(self.salaries, salary)
+        self.salaries.insert(position, salary)
+        self.telegram_ids.insert(position, telegram_id)
+
+    def remove(self, salary: float, telegram_id: int) -> None:
+        position = bisect_left(self.salaries, salary)
+        while self.telegram_ids[position] != telegram_id:
+            position += 1
+        del self.salaries[position]
+        del self.telegram_ids[position]
+
+    def match(self, upper: Optional[int]) -> List[int]:
+        """
+        Пользователи, чья желаемая зарплата не выше верхней границы вилки
+        (все, если зарплату проверить нельзя).
+        """
+        if upper is None:
+            return self.telegram_ids
+        return self.telegram_ids[:bisect_right(self.salaries, upper)]
+
+
+class SubscriptionIndex:
+    """
+    Инвертированный индекс подписок пользователей для раздачи вакансий.
+
+    Подписки раскладываются по корзинам (область, специальность, опыт),
+    внутри корзины пользователи отсортированы по желаемой зарплате. Поэтому
+    подписчики вакансии находятся за несколько обращений к словарю и
+    двоичный поиск, без перебора пользователей и их запросов.
+
+    Индекс строится один раз при запуске и обновляется точечно при
+    сохранении настроек пользователя (update).
+    """
+
+    # Ключ корзины для подписки без ограничения по параметру
+    _ANY = None
+
+    def __init__(self) -> None:
+        self._buckets: Dict[Tuple, SalaryBucket] = defaultdict(SalaryBucket)
+        self._users: Dict[int, List[Tuple[Tuple, float]]] = {}
+        # Число корзин области по специальности и опыту: по ним проверяются
+        # вакансии без этих полей
+        self._roles: Dict[Tuple, Counter] = defaultdict(Counter)
+        self._experiences: Dict[Tuple, Counter] = defaultdict(Counter)
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def __contains__(self, telegram_id: int) -> bool:
+        return telegram_id in self._users
+
+    def build(self, users_settings: Dict[int, Tuple[List[str], List[str], List[str], Optional[int]]]) -> None:
+        """
+        Заполняет индекс настройками всех пользователей.
+
+        Args:
+            users_settings (Dict[int, Tuple[List[str], List[str], List[str], Optional[int]]]):
+                Локации, специальности, грейды и зарплата по Telegram ID пользователя.
+        """
+        for telegram_id, settings in users_settings.items():
+            self.update(telegram_id, *settings)
+        logger.info(
+            f"Индекс подписок построен: пользователей {len(self)}, корзин {len(self._buckets)}")
+
+    def update(
+        self,
+        telegram_id: int,
+        locations: List[str],
+        specialities: List[str],
+        grades: List[str],
+        salary: Optional[float],
+    ) -> None:
+        """
+        Заменяет подписки пользователя новыми настройками.
+
+        Args:
+            telegram_id (int): Telegram ID пользователя.
+            locations (List[str]): Локации.
+            specialities (List[str]): Специальности.
+            grades (List[str]): Грейды.
+            salary (Optional[float]): Желаемая зарплата.
+        """
+        if salary is None:
+            self.remove(telegram_id)
+            return
+        generator = ParamsGeneratorHeadhunter()
+        self.subscribe(telegram_id, [
+            generator.get_params(locations, specialities, grade, salary)
+            for grade in grades
+        ])
+
+    def subscribe(self, telegram_id: int, params_list: List[Dict]) -> None:
+        """
+        Заменяет подписки пользователя подписками на запросы с заданными параметрами.
+
+        Args:
+            telegram_id (int): Telegram ID пользователя.
+            params_list (List[Dict]): Параметры поиска пользователя (без даты).
+        """
+        self.remove(telegram_id)
+        entries = set()
+        for params in params_list:
+            scope = get_scope(params)
+            roles = to_set(params.get("professional_role")) or {self._ANY}
+            experiences = to_set(params.get("experience")) or {self._ANY}
+            salary = params.get("salary") or 0
+            for role in roles:
+                for experience in experiences:
+                    entries.add(((scope, role, experience), salary))
+        for key, salary in entries:
+            scope, role, experience = key
+            if key not in self._buckets:
+                self._roles[scope][role] += 1
+                self._experiences[scope][experience] += 1
+            self._buckets[key].add(salary, telegram_id)
+        self._users[telegram_id] = list(entries)
+
+    def remove(self, telegram_id: int) -> None:
+        """
+        Удаляет подписки пользователя из индекса.
+
+        Args:
+            telegram_id (int): Telegram ID пользователя.
+        """
+        for key, salary in self._users.pop(telegram_id, []):
+            bucket = self._buckets[key]
+            bucket.remove(salary, telegram_id)
+            if not bucket.telegram_ids:
+                del self._buckets[key]
+                scope, role, experience = key
+                self._discard(self._roles, scope, role)
+                self._discard(self._experiences, scope, experience)
+
+    @staticmethod
+    def _discard(counters: Dict[Tuple, Counter], scope: Tuple, value: Optional[str]) -> None:
+        """
+        Уменьшает число корзин области со значением и удаляет пустые записи.
+        """
+        counter = counters[scope]
+        counter[value] -= 1
+        if counter[value] <= 0:
+            del counter[value]
+        if not counter:
+            del counters[scope]
+
+    def match(self, vacancy: VacancyHeadhunter, scope: Tuple) -> Set[int]:
+        """
+        Находит пользователей, которым подходит вакансия, найденная в заданной области.
+        Если поле в ответе API отсутствует, проверка по нему не выполняется.
+
+        Args:
+            vacancy (VacancyHeadhunter): Вакансия.
+            scope (Tuple): Область запроса, по которому найдена вакансия.
+
+        Returns:
+            Set[int]: Telegram ID подходящих пользователей.
+        """
+        if vacancy.professional_roles:
+            roles: Iterable[Optional[str]] = vacancy.professional_roles + (self._ANY,)
+        else:
+            roles = self._roles.get(scope, ())
+        if vacancy.experience:
+            experiences: Iterable[Optional[str]] = (vacancy.experience, self._ANY)
+        else:
+            experiences = self._experiences.get(scope, ())
+        upper = get_salary_upper(vacancy)
+        telegram_ids: Set[int] = set()
+        for role in roles:
+            for experience in experiences:
+                bucket = self._buckets.get((scope, role, experience))
+                if bucket:
+                    telegram_ids.update(bucket.match(upper))
+        return telegram_ids
@@ -0,0 +1,479 @@
+import asyncio
+import gc
+import itertools
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+from contextlib import asynccontextmanager
+from datetime import datetime
+from loguru import logger
+from typing import Callable, Dict, List
+
+from database.dao import SentVacanciesHeadhunterDAO
+from database.database import Base, Session, create_sqlite_engine, get_sqlite_pragmas
+from handlers.send_scheduler import TelegramSendScheduler
+from handlers.vacancy_sender import VacanciesSender
+from collectors.headhunter import VacancyHeadhunter
+from params_generators.headhunter import ParamsGeneratorHeadhunter
+from params_generators.utils import parse_date
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+# Импорт моделей регистрирует таблицы в Base.metadata
+import database.models  # noqa: F401
+
+
+async def run_profile(profile: str, duration: float = 10, readers: int = 8, writers: int = 4) -> Dict[str, float]:
+    """
+    Смешанная нагрузка на отдельный файл SQLite: читатели проверяют отправленные
+    вакансии пачками (как фильтр рассылки), писатели сохраняют пачки
+    отправленных вакансий (как буфер записи).
+
+    Args:
+        profile (str): Профиль SQLite ("performance" или "default").
+        duration (float): Длительность нагрузки (сек).
+        readers (int): Число одновременных читателей.
+        writers (int): Число одновременных писателей.
+
+    Returns:
+        Dict[str, float]: Операций чтения и записи в секунду, число ошибок.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_sqlite_engine(
+            f"sqlite+aiosqlite:///{os.path.join(directory, 'benchmark.sqlite3')}",
+            get_sqlite_pragmas(profile))
+        session_maker = async_sessionmaker(bind=engine, class_=AsyncSession)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        stats = {"reads": 0, "writes": 0, "errors": 0}
+        deadline = time.monotonic() + duration
+
+        async def read() -> None:
+            while time.monotonic() < deadline:
+                try:
+                    async with session_maker() as session:
+                        await SentVacanciesHeadhunterDAO.get_sent_vacancy_ids(
+                            session, random.randint(1, 1000),
+                            [str(random.randint(1, 100000)) for _ in range(100)])
+                    stats["reads"] += 1
+                except Exception:
+                    stats["errors"] += 1
+
+        async def write() -> None:
+            while time.monotonic() < deadline:
+                try:
+                    async with session_maker() as session:
+                        await SentVacanciesHeadhunterDAO.add_many(session, [
+                            {"user_id": random.randint(1, 1000), "vacancy_id": random.randint(1, 100000)}
+                            for _ in range(100)
+                        ])
+                        await session.commit()
+                    stats["writes"] += 1
+                except Exception:
+                    stats["errors"] += 1
+
+        started_at = time.monotonic()
+        await asyncio.gather(*[read() for _ in range(readers)],
+                             *[write() for _ in range(writers)])
+        elapsed = time.monotonic() - started_at
+        await engine.dispose()
+    return {
+        "reads_per_sec": round(stats["reads"] / elapsed, 1),
+        "writes_per_sec": round(stats["writes"] / elapsed, 1),
+        "errors": stats["errors"],
+    }
+
+
+def fill_sent_table(path: str, rows: int, users: int = 10000, batch_size: int = 100000) -> None:
+    """
+    Заполняет таблицу отправленных вакансий без индексов (как до миграции 346bdd56a26f).
+    """
+    connection = sqlite3.connect(path)
+    connection.executescript(
+        "PRAGMA journal_mode=WAL; PRAGMA synchronous=OFF;"
+        "CREATE TABLE sent_vacancies_headhunter (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL,"
+        " vacancy_id BIGINT NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,"
+        " updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);")
+    for start in range(0, rows, batch_size):
+        connection.executemany(
+            "INSERT OR IGNORE INTO sent_vacancies_headhunter (user_id, vacancy_id) VALUES (?, ?)",
+            ((i % users + 1, i) for i in range(start, min(start + batch_size, rows))))
+        connection.commit()
+    connection.close()
+
+
+async def measure_lookups(url: str, lookups: int, users: int = 10000) -> Dict[str, float]:
+    """
+    Задержка проверки пачки из 100 вакансий пользователя и поиска
+    последней отправленной вакансии (мс).
+    """
+    engine = create_sqlite_engine(url, get_sqlite_pragmas("performance"))
+    session_maker = async_sessionmaker(bind=engine, class_=AsyncSession)
+    dedup, last = [], []
+    async with session_maker() as session:
+        for _ in range(lookups):
+            telegram_id = random.randint(1, users)
+            vacancy_ids = [str(random.randint(0, 10 ** 7)) for _ in range(100)]
+            started_at = time.perf_counter()
+            await SentVacanciesHeadhunterDAO.get_sent_vacancy_ids(session, telegram_id, vacancy_ids)
+            dedup.append((time.perf_counter() - started_at) * 1000)
+            started_at = time.perf_counter()
+            await SentVacanciesHeadhunterDAO.get_last_record(session, {"user_id": telegram_id})
+            last.append((time.perf_counter() - started_at) * 1000)
+    await engine.dispose()
+    return {
+        "dedup_median_ms": round(statistics.median(dedup), 3),
+        "last_record_median_ms": round(statistics.median(last), 3),
+    }
+
+
+async def run_indexes(rows: int = 10 ** 7) -> None:
+    """
+    Сравнивает задержку поиска по таблице отправленных вакансий из rows строк
+    до и после создания индексов миграции 346bdd56a26f.
+
+    Args:
+        rows (int): Количество строк в таблице.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "benchmark.sqlite3")
+        url = f"sqlite+aiosqlite:///{path}"
+        started_at = time.monotonic()
+        fill_sent_table(path, rows)
+        logger.info(
+            f"Таблица из {rows} строк заполнена за {time.monotonic() - started_at:.1f} сек.")
+        logger.info(f"Без индексов: {await measure_lookups(url, 5)}")
+        started_at = time.monotonic()
+        connection = sqlite3.connect(path)
+        connection.executescript(
+            "CREATE UNIQUE INDEX uq_sent_vacancies_headhunter_user_vacancy"
+            " ON sent_vacancies_headhunter (user_id, vacancy_id);"
+            "CREATE INDEX ix_sent_vacancies_headhunter_user_id_created_at"
+            " ON sent_vacancies_headhunter (user_id, created_at);")
+        connection.close()
+        logger.info(
+            f"Индексы созданы за {time.monotonic() - started_at:.1f} сек.")
+        logger.info(f"С индексами: {await measure_lookups(url, 1000)}")
+
+
+class StubResponse:
+    """
+    Ответ заглушки API HeadHunter.
+    """
+
+    status = 200
+    headers: Dict[str, str] = {}
+
+    def __init__(self, data: Dict) -> None:
+        self._data = data
+
+    def raise_for_status(self) -> None:
+        pass
+
+    async def json(self) -> Dict:
+        return self._data
+
+
+class StubHeadhunterSession:
+    """
+    Заглушка HTTP-сессии с API HeadHunter: по каждому сочетанию локации,
+    специальности и опыта отдает vacancies вакансий с задержкой latency.
+    """
+
+    def __init__(self, vacancies: int, latency: float) -> None:
+        self.vacancies = vacancies
+        self.latency = latency
+
+    @staticmethod
+    def _values(params: Dict, name: str) -> List:
+        value = params.get(name)
+        return value if isinstance(value, list) else [value]
+
+    @asynccontextmanager
+    async def get(self, url: str, params: Dict):
+        await asyncio.sleep(self.latency)
+        scope = f"{params.get('area')}|{params.get('work_format')}"
+        items = []
+        for role, experience in itertools.product(
+                self._values(params, "professional_role"), self._values(params, "experience")):
+            base = zlib.crc32(f"{scope}|{role}|{experience}".encode()) % 10 ** 5 * 10 ** 4
+            items.extend({
+                "id": str(base + i),
+                "name": "Вакансия",
+                "alternate_url": "https://hh.ru",
+                "published_at": datetime.now().strftime("%Y-%m-%dT%H:%M:%S+0300"),
+                "experience": {"id": experience},
+                "professional_roles": [{"id": role}],
+            } for i in range(self.vacancies))
+        page, per_page = params["page"], params["per_page"]
+        yield StubResponse({
+            "found": len(items),
+            "pages": -(-len(items) // per_page),
+            "items": items[page * per_page:(page + 1) * per_page],
+        })
+
+
+class StubHttpClient:
+    """
+    Заглушка общего HTTP-клиента для бенчмарка рассылки.
+    """
+
+    def __init__(self, vacancies: int, latency: float) -> None:
+        self.session = StubHeadhunterSession(vacancies, latency)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {}
+
+
+class StubBot:
+    """
+    Заглушка Telegram-бота: отправка сообщения занимает latency секунд.
+    """
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.sent = 0
+
+    async def send_message(self, *args, **kwargs) -> None:
+        await asyncio.sleep(self.latency)
+        self.sent += 1
+
+
+class SingleSessionSender(VacanciesSender):
+    """
+    Рассылка как до перехода на короткие сессии: проверка на повтор всех
+    пользователей идет через одну сессию цикла, поэтому ее запросы выполняются
+    по очереди на одном соединении.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.session = Session()
+        self._lock = asyncio.Lock()
+
+    async def filter_sent_vacancies(self, session: AsyncSession, vacancies: List[VacancyHeadhunter], telegram_id: int) -> List[VacancyHeadhunter]:
+        async with self._lock:
+            return await super().filter_sent_vacancies(self.session, vacancies, telegram_id)
+
+
+def fill_users(path: str, users: int, sent: int) -> None:
+    """
+    Заполняет пользователей со случайными настройками поиска и по sent
+    отправленных вакансий на пользователя.
+    """
+    generator = ParamsGeneratorHeadhunter()
+    locations = list(generator._LOCATIONS_PARAMS)
+    specialities = list(generator._SPETIALITIES_PARAMS)
+    grades = list(generator._GRADES_PARAMS)
+    connection = sqlite3.connect(path)
+    for telegram_id in range(1, users + 1):
+        connection.execute("INSERT INTO users (id, telegram_id) VALUES (?, ?)", (telegram_id, telegram_id))
+        connection.execute("INSERT INTO locations (user_id, location) VALUES (?, ?)",
+                           (telegram_id, random.choice(locations)))
+        connection.executemany("INSERT INTO specialities (user_id, speciality) VALUES (?, ?)",
+                               [(telegram_id, speciality) for speciality in random.sample(specialities, 2)])
+        connection.execute("INSERT INTO grades (user_id, grade) VALUES (?, ?)",
+                           (telegram_id, random.choice(grades)))
+        connection.execute("INSERT INTO salaries (user_id, salary) VALUES (?, ?)", (telegram_id, 0))
+        connection.executemany("INSERT OR IGNORE INTO sent_vacancies_headhunter (user_id, vacancy_id) VALUES (?, ?)",
+                               [(telegram_id, random.randint(0, 10 ** 9)) for _ in range(sent)])
+    connection.commit()
+    connection.close()
+
+
+async def run_pipeline_mode(sender_class: type, users: int, sent: int, vacancies: int,
+                            hh_latency: float, telegram_latency: float) -> Dict[str, float]:
+    """
+    Один шаг рассылки по всем запросам на отдельной заполненной базе
+    с заглушками HeadHunter и Telegram.
+
+    Returns:
+        Dict[str, float]: Время шага (поиск, проверка, outbox) и время до
+            отправки всех вакансий (сек).
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "benchmark.sqlite3")
+        engine = create_sqlite_engine(f"sqlite+aiosqlite:///{path}", get_sqlite_pragmas("performance"))
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        fill_users(path, users, sent)
+        # Все сессии рассылки (общий Session) работают с временной базой
+        Session.configure(bind=engine)
+        bot = StubBot(telegram_latency)
+        # Лимиты Telegram не ограничивают: сравнивается работа с базой
+        sender = sender_class(bot, StubHttpClient(vacancies, hh_latency),
+                              send_scheduler=TelegramSendScheduler(global_rate=100000, chat_rate=100000))
+        async with Session() as session:
+            await sender.refresh_subscriptions(session)
+            planner = await sender.plan_queries(session, list(sender.catalog))
+        started_at = time.monotonic()
+        await sender.run_cycle(planner)
+        cycle = time.monotonic() - started_at
+        while sender.send_queue.qsize() or sender.send_queue._unfinished_tasks:
+            await asyncio.sleep(0.01)
+        total = time.monotonic() - started_at
+        await sender.close()
+        await sender.send_scheduler.close()
+        await sender.sent_writer.close()
+        if isinstance(sender, SingleSessionSender):
+            await sender.session.close()
+        await engine.dispose()
+    return {
+        "cycle_sec": round(cycle, 3),
+        "all_sent_sec": round(total, 3),
+        "matched": sender.queue_depths.get("matched", 0),
+        "sent": bot.sent,
+    }
+
+
+async def run_pipeline(users: int = 500, sent: int = 2000, vacancies: int = 20,
+                       hh_latency: float = 0.05, telegram_latency: float = 0.001, repeats: int = 3) -> None:
+    """
+    Сравнивает время шага рассылки с одной сессией на цикл и с короткими
+    сессиями у каждой задачи (медиана repeats запусков, режимы чередуются).
+
+    Args:
+        users (int): Количество пользователей.
+        sent (int): Отправленных вакансий на пользователя в базе.
+        vacancies (int): Вакансий на сочетание локации, специальности и опыта.
+        hh_latency (float): Задержка ответа HeadHunter (сек).
+        telegram_latency (float): Задержка отправки сообщения (сек).
+        repeats (int): Количество запусков каждого режима.
+    """
+    modes = {"одна сессия": SingleSessionSender, "сессии задач": VacanciesSender}
+    results: Dict[str, List[Dict[str, float]]] = {name: [] for name in modes}
+    for _ in range(repeats):
+        for name, sender_class in modes.items():
+            results[name].append(await run_pipeline_mode(
+                sender_class, users, sent, vacancies, hh_latency, telegram_latency))
+    for name, runs in results.items():
+        medians = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+        logger.info(f"Рассылка, {name}: {medians}")
+
+
+def make_vacancies_payload(items: int) -> List[Dict]:
+    """
+    Синтетические элементы ответа /vacancies: повторяющиеся локации,
+    работодатели и валюты, как в реальной выдаче. Ответ проходит через
+    json, чтобы одинаковые строки были разными объектами, как после разбора.
+    """
+    areas = [f"Город {i}" for i in range(50)]
+    employers = [f"Компания {i}" for i in range(2000)]
+    experiences = ["noExperience", "between1And3", "between3And6", "moreThan6"]
+    payload = [{
+        "id": str(10 ** 8 + i),
+        "name": f"Вакансия {i}",
+        "salary": random.choice([None, {"from": 100000, "to": 200000, "currency": random.choice(["RUR", "USD"])}]),
+        "area": {"id": "1", "name": random.choice(areas)},
+        "employer": {"id": "2", "name": random.choice(employers)},
+        "alternate_url": f"https://hh.ru/vacancy/{10 ** 8 + i}",
+        "snippet": {"requirement": f"Требования {i}", "responsibility": f"Обязанности {i}"},
+        "published_at": "2026-10-17T10:00:00+0300",
+        "experience": {"id": random.choice(experiences), "name": "Опыт"},
+        "professional_roles": [{"id": str(random.choice([96, 124, 160])), "name": "Роль"}],
+    } for i in range(items)]
+    return json.loads(json.dumps(payload, ensure_ascii=False))
+
+
+def vacancy_to_dict(item: Dict) -> Dict:
+    """
+    Вакансия в виде словаря с теми же полями, что и VacancyHeadhunter
+    (как parse_vacancies до перехода на записи).
+    """
+    salary = item.get("salary")
+    snippet = item.get("snippet", {})
+    return {
+        "id": item.get("id"),
+        "name": item.get("name"),
+        "salary_from": salary.get("from") if salary else None,
+        "salary_to": salary.get("to") if salary else None,
+        "salary_currency": salary.get("currency") if salary else None,
+        "location": item.get("area", {}).get("name") if item.get("area") else None,
+        "employer": item.get("employer", {}).get("name") if item.get("employer") else None,
+        "link": item.get("alternate_url"),
+        "description": snippet.get("requirement", ""),
+        "responsibility": snippet.get("responsibility", ""),
+        "published_at": parse_date(item.get("published_at")),
+        "experience": item["experience"]["id"] if item.get("experience") else None,
+        "professional_roles": [role["id"] for role in item.get("professional_roles") or ()],
+    }
+
+
+def measure_records(build: Callable[[Dict], object], items: int, repeats: int) -> Dict[str, float]:
+    """
+    Память, которую занимают вакансии после освобождения исходного ответа
+    (байт на вакансию), и скорость построения (вакансий в секунду, лучший из repeats).
+    """
+    speeds = []
+    for _ in range(repeats):
+        payload = make_vacancies_payload(items)
+        gc.collect()
+        started_at = time.perf_counter()
+        vacancies = [build(item) for item in payload]
+        speeds.append(items / (time.perf_counter() - started_at))
+        del vacancies, payload
+
+    payload = make_vacancies_payload(items)
+    gc.collect()
+    tracemalloc.start()
+    vacancies = [build(item) for item in payload]
+    # Вакансии живут дольше страницы ответа: учитываем только то, что от нее осталось
+    del payload
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del vacancies
+    return {
+        "bytes_per_vacancy": round(size / items, 1),
+        "vacancies_per_sec": round(max(speeds)),
+    }
+
+
+def run_records(items: int = 20000, repeats: int = 5) -> None:
+    """
+    Сравнивает словари и VacancyHeadhunter, построенные из одного ответа API.
+
+    Args:
+        items (int): Количество вакансий.
+        repeats (int): Количество замеров скорости.
+    """
+    for name, build in (("словари", vacancy_to_dict), ("VacancyHeadhunter", VacancyHeadhunter.from_api)):
+        logger.info(f"Вакансии, {name}: {measure_records(build, items, repeats)}")
+
+
+async def main() -> None:
+    """
+    Запуск из каталога src:
+        python -m database.benchmark            — сравнение профилей SQLite;
+        python -m database.benchmark indexes N  — поиск по таблице из N строк
+                                                  до и после индексов;
+        python -m database.benchmark pipeline N — шаг рассылки для N пользователей
+                                                  с одной сессией и с сессиями задач;
+        python -m database.benchmark records N  — память и скорость построения
+                                                  N вакансий (словари и записи).
+    """
+    # Без файла логов бота (его добавляет импорт settings): результаты только в консоль
+    logger.remove()
+    logger.add(sys.stderr, level="INFO", filter=lambda record: record["name"] == __name__)
+    if len(sys.argv) > 1 and sys.argv[1] == "indexes":
+        await run_indexes(int(sys.argv[2]) if len(sys.argv) > 2 else 10 ** 7)
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "records":
+        run_records(int(sys.argv[2]) if len(sys.argv) > 2 else 20000)
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "pipeline":
+        await run_pipeline(int(sys.argv[2]) if len(sys.argv) > 2 else 500)
+        return
+    for profile in ("default", "performance"):
+        logger.info(f"Профиль {profile}: {await run_profile(profile)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,16 +1,43 @@
-from typing import TypeVar, Generic, Optional, List
+from datetime import datetime, timedelta
+from typing import TypeVar, Generic, Iterable, Iterator, Optional, List, Dict, Set
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.future import select
-from sqlalchemy import delete as sqlalchemy_delete, func, desc
+from sqlalchemy import delete as sqlalchemy_delete, update as sqlalchemy_update, func, desc
+from sqlalchemy.engine import Row
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.database import Base
-from database.models import User, Location, Grade, Salary, Speciality, SentVacanciesHeadhunter
+from database.models import (
+    User, Location, Grade, Salary, Speciality,
+    SentVacanciesHeadhunter, OutboxVacancyHeadhunter, FailedVacancyHeadhunter,
+    QueryWatermarkHeadhunter
+)
 
 
 T = TypeVar("T", bound=Base)
 
+# Максимальное число параметров в одном запросе SQLite (SQLITE_MAX_VARIABLE_NUMBER
+# в сборках до 3.32.0), с запасом под остальные условия запроса.
+SQLITE_MAX_VARIABLES = 900
+
+
+def chunked(items: Iterable, size: int = SQLITE_MAX_VARIABLES) -> Iterator[List]:
+    """
+    Разбивает значения на части для запросов с IN (...).
+
+    Args:
+        items (Iterable): Значения.
+        size (int): Максимальный размер части.
+
+    Yields:
+        List: Очередная часть значений.
+    """
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
 
 class BaseDAO(Generic[T]):
     """
@@ -188,7 +215,7 @@ class BaseDAO(Generic[T]):
         logger.info(f"Поиск последней записи {cls.model.__name__}")
         try:
             query = select(cls.model).filter_by(
-                **filter).order_by(desc(cls.model.created_at))
+                **filter).order_by(desc(cls.model.created_at)).limit(1)
             result = await session.execute(query)
             record = result.scalars().first()
             return record
@@ -251,3 +278,279 @@ class SentVacanciesHeadhunterDAO(BaseDAO[SentVacanciesHeadhunter]):
             logger.error(
                 f"Ошибка при получении последней записи отправленных вакансий для пользователя с ID {telegram_id}: {e}")
             raise
+
+    @classmethod
+    async def add_many(cls, session: AsyncSession, values: List[dict]) -> None:
+        """
+        Добавляет записи об отправленных вакансиях многострочными INSERT.
+        Уже существующие пары (пользователь, вакансия) пропускаются.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            values (List[dict]): Поля новых записей (user_id, vacancy_id).
+        """
+        if not values:
+            return
+        logger.info(
+            f"Добавление {len(values)} записей {cls.model.__name__}")
+        try:
+            for chunk in chunked(values, SQLITE_MAX_VARIABLES // 2):
+                query = sqlite_insert(cls.model).values(
+                    chunk).on_conflict_do_nothing()
+                await session.execute(query)
+            await session.flush()
+        except SQLAlchemyError as e:
+            await session.rollback()
+            logger.error(f"Ошибка при добавлении записей: {e}")
+            raise e
+
+    @classmethod
+    async def get_sent_vacancy_ids(cls, session: AsyncSession, telegram_id: int, vacancy_ids: Iterable[str]) -> Set[str]:
+        """
+        Получение идентификаторов вакансий, которые уже отправлялись пользователю.
+        Выполняет один запрос IN (...) на каждые SQLITE_MAX_VARIABLES вакансий.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            telegram_id (int): Telegram ID пользователя.
+            vacancy_ids (Iterable[str]): Идентификаторы проверяемых вакансий.
+
+        Returns:
+            Set[str]: Идентификаторы уже отправленных вакансий.
+        """
+        vacancy_ids = {int(vacancy_id) for vacancy_id in vacancy_ids}
+        logger.info(
+            f"Проверка {len(vacancy_ids)} вакансий пользователя {telegram_id}")
+        sent_ids = set()
+        try:
+            for chunk in chunked(vacancy_ids):
+                query = select(cls.model.vacancy_id).where(
+                    cls.model.user_id == telegram_id,
+                    cls.model.vacancy_id.in_(chunk))
+                result = await session.execute(query)
+                sent_ids.update(str(vacancy_id)
+                                for vacancy_id in result.scalars())
+            logger.info(
+                f"Уже отправлено пользователю {telegram_id}: {len(sent_ids)} вакансий")
+            return sent_ids
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при проверке отправленных вакансий: {e}")
+            raise e
+
+    @classmethod
+    async def delete_expired(cls, session: AsyncSession, days: int, limit: int) -> int:
+        """
+        Удаляет не больше limit записей старше days дней, начиная с самых старых.
+
+        Индекса по created_at нет, но записи добавляются по порядку, поэтому
+        устаревшие лежат в начале таблицы. Сначала отдельным чтением по первым
+        limit записям (по id) находится граница пачки, затем удаляется диапазон
+        id до нее. Ни чтение, ни удаление не просматривают всю таблицу, и
+        блокировка записи держится только на время удаления пачки.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            days (int): Срок хранения записей (дней).
+            limit (int): Максимальное число удаляемых записей.
+
+        Returns:
+            int: Количество удаленных записей.
+        """
+        try:
+            # created_at заполняется SQLite (CURRENT_TIMESTAMP, UTC), поэтому и
+            # граница считается в базе
+            expired_before = func.datetime("now", f"-{int(days)} days")
+            head = select(cls.model.id, cls.model.created_at).order_by(
+                cls.model.id).limit(limit).subquery()
+            last_id = (await session.execute(
+                select(func.max(head.c.id)).where(head.c.created_at < expired_before))).scalar()
+            if last_id is None:
+                return 0
+            result = await session.execute(
+                sqlalchemy_delete(cls.model).where(
+                    cls.model.id <= last_id, cls.model.created_at < expired_before))
+            await session.flush()
+            return result.rowcount
+        except SQLAlchemyError as e:
+            await session.rollback()
+            logger.error(f"Ошибка при удалении устаревших записей: {e}")
+            raise e
+
+
+class OutboxVacancyHeadhunterDAO(BaseDAO[OutboxVacancyHeadhunter]):
+    """
+    Очередь вакансий к отправке (outbox). Запись захватывается отправителем
+    (claimed_at) и удаляется после подтверждения отправки. Захват, не
+    подтвержденный за отведенное время, снимается и запись отправляется снова.
+    """
+    model = OutboxVacancyHeadhunter
+
+    @classmethod
+    async def enqueue(cls, session: AsyncSession, values: List[dict]) -> None:
+        """
+        Добавляет вакансии в очередь. Уже стоящие в очереди пары
+        (пользователь, вакансия) пропускаются.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            values (List[dict]): Поля записей (user_id, vacancy_id, message, link).
+        """
+        if not values:
+            return
+        logger.info(f"Добавление {len(values)} вакансий в очередь отправки")
+        try:
+            for chunk in chunked(values, SQLITE_MAX_VARIABLES // 4):
+                query = sqlite_insert(cls.model).values(
+                    chunk).on_conflict_do_nothing()
+                await session.execute(query)
+            await session.flush()
+        except SQLAlchemyError as e:
+            await session.rollback()
+            logger.error(f"Ошибка при добавлении вакансий в очередь: {e}")
+            raise e
+
+    @classmethod
+    async def claim(cls, session: AsyncSession, limit: int, telegram_id: Optional[int] = None) -> List[Row]:
+        """
+        Захватывает свободные записи очереди для отправки.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            limit (int): Максимальное число записей.
+            telegram_id (Optional[int]): Захватывать записи только этого пользователя.
+
+        Returns:
+            List[Row]: Записи (id, user_id, vacancy_id, message, link) в порядке добавления.
+        """
+        try:
+            conditions = [cls.model.claimed_at.is_(None)]
+            if telegram_id is not None:
+                conditions.append(cls.model.user_id == telegram_id)
+            free = select(cls.model.id).where(
+                *conditions).order_by(cls.model.id).limit(limit)
+            query = sqlalchemy_update(cls.model).where(cls.model.id.in_(free)).values(
+                claimed_at=datetime.now(), attempts=cls.model.attempts + 1
+            ).returning(cls.model.id, cls.model.user_id, cls.model.vacancy_id,
+                        cls.model.message, cls.model.link)
+            result = await session.execute(query)
+            records = sorted(result.all(), key=lambda record: record.id)
+            await session.flush()
+            if records:
+                logger.info(
+                    f"Захвачено {len(records)} записей очереди отправки")
+            return records
+        except SQLAlchemyError as e:
+            await session.rollback()
+            logger.error(f"Ошибка при захвате записей очереди: {e}")
+            raise e
+
+    @classmethod
+    async def release_stale(cls, session: AsyncSession, timeout: float) -> int:
+        """
+        Снимает захват с записей, не подтвержденных за timeout секунд.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            timeout (float): Время на отправку захваченной записи (сек).
+
+        Returns:
+            int: Количество освобожденных записей.
+        """
+        try:
+            query = sqlalchemy_update(cls.model).where(
+                cls.model.claimed_at < datetime.now() - timedelta(seconds=timeout)
+            ).values(claimed_at=None)
+            result = await session.execute(query)
+            await session.flush()
+            if result.rowcount:
+                logger.warning(
+                    f"Возвращено в очередь {result.rowcount} неподтвержденных записей")
+            return result.rowcount
+        except SQLAlchemyError as e:
+            await session.rollback()
+            logger.error(f"Ошибка при освобождении записей очереди: {e}")
+            raise e
+
+    @classmethod
+    async def ack(cls, session: AsyncSession, ids: Iterable[int]) -> None:
+        """
+        Удаляет обработанные записи очереди.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            ids (Iterable[int]): Идентификаторы записей.
+        """
+        try:
+            for chunk in chunked(ids):
+                await session.execute(sqlalchemy_delete(cls.model).where(cls.model.id.in_(chunk)))
+            await session.flush()
+        except SQLAlchemyError as e:
+            await session.rollback()
+            logger.error(f"Ошибка при удалении записей очереди: {e}")
+            raise e
+
+
+class FailedVacancyHeadhunterDAO(BaseDAO[FailedVacancyHeadhunter]):
+    model = FailedVacancyHeadhunter
+
+
+class QueryWatermarkHeadhunterDAO(BaseDAO[QueryWatermarkHeadhunter]):
+    model = QueryWatermarkHeadhunter
+
+    @classmethod
+    async def get_watermarks(cls, session: AsyncSession, query_ids: List[str]) -> Dict[str, datetime]:
+        """
+        Получение дат последних найденных вакансий для набора запросов.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            query_ids (List[str]): Идентификаторы запросов.
+
+        Returns:
+            Dict[str, datetime]: Дата публикации последней вакансии по каждому известному запросу.
+        """
+        logger.info(f"Получение отметок для {len(query_ids)} запросов")
+        try:
+            watermarks = {}
+            for chunk in chunked(query_ids):
+                query = select(cls.model.query_id, cls.model.published_at).where(
+                    cls.model.query_id.in_(chunk))
+                result = await session.execute(query)
+                watermarks.update(result.tuples().all())
+            return watermarks
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при получении отметок запросов: {e}")
+            raise e
+
+    @classmethod
+    async def save_watermarks(cls, session: AsyncSession, watermarks: Dict[str, datetime]) -> None:
+        """
+        Сохранение дат последних найденных вакансий. Отметка запроса
+        только сдвигается вперед и никогда не уменьшается.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            watermarks (Dict[str, datetime]): Дата публикации последней вакансии по каждому запросу.
+        """
+        if not watermarks:
+            return
+        logger.info(f"Сохранение отметок для {len(watermarks)} запросов")
+        try:
+            for chunk in chunked(watermarks.items(), SQLITE_MAX_VARIABLES // 2):
+                query = sqlite_insert(cls.model).values([
+                    {"query_id": query_id, "published_at": published_at}
+                    for query_id, published_at in chunk
+                ])
+                query = query.on_conflict_do_update(
+                    index_elements=[cls.model.query_id],
+                    set_={
+                        "published_at": func.max(cls.model.published_at, query.excluded.published_at),
+                        "updated_at": func.now(),
+                    },
+                )
+                await session.execute(query)
+            await session.flush()
+        except SQLAlchemyError as e:
+            await session.rollback()
+            logger.error(f"Ошибка при сохранении отметок запросов: {e}")
+            raise e
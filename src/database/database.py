@@ -1,14 +1,94 @@
+from contextvars import ContextVar
 from datetime import datetime
-from sqlalchemy import func, TIMESTAMP, Integer
+from typing import Dict, Optional, Union
+from sqlalchemy import event, func, text, TIMESTAMP, Integer
 from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase
-from sqlalchemy.ext.asyncio import AsyncAttrs, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncAttrs, AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
-from settings import DATABASE_URL
+from settings import (
+    DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+    SQLITE_PROFILE, SQLITE_AUTO_VACUUM, SQLITE_JOURNAL_MODE, SQLITE_SYNCHRONOUS, SQLITE_CACHE_SIZE,
+    SQLITE_MMAP_SIZE, SQLITE_BUSY_TIMEOUT, SQLITE_TEMP_STORE
+)
 
 
-engine = create_async_engine(
-    DATABASE_URL
-)
+class QueryCounter:
+    """
+    Счетчик SQL-запросов. Считает запросы, выполненные в задаче, где он
+    установлен через query_counter.set(), и в порожденных ею задачах.
+    """
+
+    def __init__(self) -> None:
+        self.count: int = 0
+
+
+query_counter: ContextVar[Optional[QueryCounter]] = ContextVar("query_counter", default=None)
+
+
+def get_sqlite_pragmas(profile: str = SQLITE_PROFILE) -> Dict[str, Union[str, int]]:
+    """
+    PRAGMA, выполняемые на каждом новом соединении с SQLite.
+
+    Профиль "performance" включает WAL (читатели не блокируют запись и наоборот),
+    synchronous=NORMAL (в режиме WAL не теряет целостность при сбое процесса),
+    увеличенный кеш страниц, mmap, ожидание блокировки вместо ошибки
+    "database is locked" и временные таблицы в памяти.
+
+    Args:
+        profile (str): "performance" или "default" (настройки SQLite по умолчанию).
+
+    Returns:
+        Dict[str, Union[str, int]]: Значение по названию PRAGMA.
+    """
+    if profile == "default":
+        return {}
+    if profile == "performance":
+        return {
+            "journal_mode": SQLITE_JOURNAL_MODE,
+            "synchronous": SQLITE_SYNCHRONOUS,
+            "cache_size": SQLITE_CACHE_SIZE,
+            "mmap_size": SQLITE_MMAP_SIZE,
+            "busy_timeout": SQLITE_BUSY_TIMEOUT,
+            "temp_store": SQLITE_TEMP_STORE,
+        }
+    raise ValueError(f"Неизвестный профиль SQLite: {profile}")
+
+
+def create_sqlite_engine(url: str, pragmas: Dict[str, Union[str, int]]) -> AsyncEngine:
+    """
+    Создает асинхронный движок SQLite с пулом соединений и заданными PRAGMA.
+
+    Args:
+        url (str): Адрес базы данных.
+        pragmas (Dict[str, Union[str, int]]): PRAGMA для каждого соединения.
+
+    Returns:
+        AsyncEngine: Движок SQLAlchemy.
+    """
+    engine = create_async_engine(
+        url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT
+    )
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_query(connection, cursor, statement, parameters, context, executemany):
+        counter = query_counter.get()
+        if counter is not None:
+            counter.count += 1
+
+    return engine
+
+
+engine = create_sqlite_engine(DATABASE_URL, get_sqlite_pragmas())
 
 Session = async_sessionmaker(
     bind=engine,
@@ -39,6 +119,20 @@ class Base(AsyncAttrs, DeclarativeBase):
 async def init_db():
     """
     Инициализация базы данных: создание всех таблиц на основе моделей.
+
+    В профиле "performance" новая база создается с инкрементальным
+    auto_vacuum (для очистки старых записей). PRAGMA выполняется один раз и
+    только для пустой базы, а не на каждом соединении: для существующей базы
+    она ничего не меняет, но требует блокировку записи. Заголовок базы уже
+    записан при включении WAL, поэтому режим применяется через VACUUM, который
+    для пустой базы выполняется мгновенно.
     """
+    if SQLITE_PROFILE == "performance":
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            tables = (await conn.execute(text("SELECT count(*) FROM sqlite_master"))).scalar()
+            if not tables:
+                await conn.execute(text(f"PRAGMA auto_vacuum={SQLITE_AUTO_VACUUM}"))
+                await conn.execute(text("VACUUM"))
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
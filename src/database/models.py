@@ -1,4 +1,6 @@
-from sqlalchemy import BigInteger, String, Float, ForeignKey
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import BigInteger, Index, Integer, String, Float, ForeignKey, TIMESTAMP, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database.database import Base
@@ -18,7 +20,7 @@ class Location(Base):
     __tablename__ = "locations"
 
     user_id: Mapped[int] = mapped_column(
-        ForeignKey("users.id"), nullable=False)
+        ForeignKey("users.id"), nullable=False, index=True)
     location: Mapped[str] = mapped_column(String, nullable=False)
 
     user: Mapped['User'] = relationship(
@@ -29,7 +31,7 @@ class Grade(Base):
     __tablename__ = "grades"
 
     user_id: Mapped[int] = mapped_column(
-        ForeignKey("users.id"), nullable=False)
+        ForeignKey("users.id"), nullable=False, index=True)
     grade: Mapped[str] = mapped_column(String, nullable=False)
 
     user: Mapped['User'] = relationship(
@@ -40,7 +42,7 @@ class Salary(Base):
     __tablename__ = "salaries"
 
     user_id: Mapped[int] = mapped_column(
-        ForeignKey("users.id"), nullable=False)
+        ForeignKey("users.id"), nullable=False, index=True)
     salary: Mapped[float] = mapped_column(Float, nullable=False)
 
     user: Mapped['User'] = relationship(
@@ -51,7 +53,7 @@ class Speciality(Base):
     __tablename__ = "specialities"
 
     user_id: Mapped[int] = mapped_column(
-        ForeignKey("users.id"), nullable=False)
+        ForeignKey("users.id"), nullable=False, index=True)
     speciality: Mapped[str] = mapped_column(String, nullable=False)
 
     user: Mapped['User'] = relationship(
@@ -60,6 +62,14 @@ class Speciality(Base):
 
 class SentVacanciesHeadhunter(Base):
     __tablename__ = "sent_vacancies_headhunter"
+    __table_args__ = (
+        # Уникальный индекс, а не ограничение таблицы: в существующие базы
+        # он добавляется миграцией 346bdd56a26f без пересоздания таблицы
+        Index("uq_sent_vacancies_headhunter_user_vacancy",
+              "user_id", "vacancy_id", unique=True),
+        Index("ix_sent_vacancies_headhunter_user_id_created_at",
+              "user_id", "created_at"),
+    )
 
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id"), nullable=False)
@@ -68,3 +78,47 @@ class SentVacanciesHeadhunter(Base):
 
     user: Mapped['User'] = relationship(
         "User", backref="sent_vacancies_headhunter")
+
+
+class OutboxVacancyHeadhunter(Base):
+    __tablename__ = "outbox_vacancies_headhunter"
+    __table_args__ = (
+        UniqueConstraint("user_id", "vacancy_id",
+                         name="uq_outbox_vacancies_headhunter_user_vacancy"),
+    )
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id"), nullable=False)
+    vacancy_id: Mapped[int] = mapped_column(
+        BigInteger, nullable=False)
+    message: Mapped[str] = mapped_column(String, nullable=False)
+    link: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    claimed_at: Mapped[Optional[datetime]] = mapped_column(
+        TIMESTAMP, nullable=True)
+    attempts: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0)
+
+    user: Mapped['User'] = relationship(
+        "User", backref="outbox_vacancies_headhunter")
+
+
+class FailedVacancyHeadhunter(Base):
+    __tablename__ = "failed_vacancies_headhunter"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id"), nullable=False, index=True)
+    vacancy_id: Mapped[int] = mapped_column(
+        BigInteger, nullable=False)
+    error: Mapped[str] = mapped_column(String, nullable=False)
+
+    user: Mapped['User'] = relationship(
+        "User", backref="failed_vacancies_headhunter")
+
+
+class QueryWatermarkHeadhunter(Base):
+    __tablename__ = "query_watermarks_headhunter"
+
+    query_id: Mapped[str] = mapped_column(
+        String, unique=True, nullable=False)
+    published_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP, nullable=False)
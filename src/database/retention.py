@@ -0,0 +1,132 @@
+import asyncio
+import time
+from loguru import logger
+from sqlalchemy import text
+from typing import Dict, Optional
+
+from database.dao import SentVacanciesHeadhunterDAO
+from database.database import Session, engine
+
+
+class SentVacanciesRetention:
+    """
+    Фоновая очистка таблицы отправленных вакансий от записей старше
+    days дней: вакансии HeadHunter к этому времени уже закрыты, а записи
+    только увеличивают таблицу и глубину индексов.
+
+    Записи удаляются пачками по batch_size в отдельных коротких транзакциях
+    с паузой между ними, чтобы не держать блокировку записи и не мешать
+    рассылке и обработчикам бота. После удаления освободившиеся страницы
+    возвращаются файловой системе через PRAGMA incremental_vacuum (если база
+    создана с auto_vacuum=INCREMENTAL; иначе SQLite использует их повторно
+    для новых записей).
+
+    Args:
+        days (int): Срок хранения записей (дней).
+        batch_size (int): Количество записей, удаляемых одной транзакцией.
+        interval (float): Интервал между запусками очистки (сек).
+        pause (float): Пауза между пачками (сек).
+        vacuum_pages (int): Сколько свободных страниц возвращать за один запуск.
+    """
+
+    def __init__(
+        self,
+        days: int = 90,
+        batch_size: int = 5000,
+        interval: float = 3600,
+        pause: float = 0.1,
+        vacuum_pages: int = 10000,
+    ) -> None:
+        self.days = days
+        self.batch_size = batch_size
+        self.interval = interval
+        self.pause = pause
+        self.vacuum_pages = vacuum_pages
+        self.runs: int = 0
+        self.deleted: int = 0
+        self.vacuumed_pages: int = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """
+        Запускает периодическую очистку в фоне.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_periodically())
+
+    async def run(self) -> int:
+        """
+        Удаляет все устаревшие записи пачками и освобождает место в файле базы.
+
+        Returns:
+            int: Количество удаленных записей.
+        """
+        started_at = time.monotonic()
+        deleted = 0
+        while True:
+            async with Session() as session:
+                count = await SentVacanciesHeadhunterDAO.delete_expired(
+                    session, self.days, self.batch_size)
+                await session.commit()
+            deleted += count
+            if count < self.batch_size:
+                break
+            await asyncio.sleep(self.pause)
+        if deleted:
+            await self._vacuum()
+        self.runs += 1
+        self.deleted += deleted
+        logger.info(
+            f"Удалено {deleted} отправленных вакансий старше {self.days} дней за {time.monotonic() - started_at:.3f} сек.")
+        return deleted
+
+    async def _vacuum(self) -> None:
+        """
+        Возвращает файловой системе до vacuum_pages свободных страниц.
+        """
+        async with engine.connect() as connection:
+            auto_vacuum = (await connection.execute(text("PRAGMA auto_vacuum"))).scalar()
+            if auto_vacuum != 2:
+                logger.info(
+                    "auto_vacuum базы не INCREMENTAL, освободившиеся страницы будут заняты новыми записями")
+                return
+            free_pages = (await connection.execute(text("PRAGMA freelist_count"))).scalar()
+            # incremental_vacuum освобождает по странице на каждом шаге выполнения,
+            # а execute делает один шаг, поэтому PRAGMA выполняется как скрипт
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.executescript(
+                f"PRAGMA incremental_vacuum({int(self.vacuum_pages)});")
+        self.vacuumed_pages += min(free_pages, self.vacuum_pages)
+
+    async def _run_periodically(self) -> None:
+        while True:
+            try:
+                await self.run()
+            except Exception as e:
+                logger.error(f"Ошибка при очистке отправленных вакансий: {e}")
+            await asyncio.sleep(self.interval)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Статистика очистки: запусков, удаленных записей, освобожденных страниц.
+
+        Returns:
+            Dict[str, int]: Статистика очистки.
+        """
+        return {
+            "runs": self.runs,
+            "deleted": self.deleted,
+            "vacuumed_pages": self.vacuumed_pages,
+        }
+
+    async def close(self) -> None:
+        """
+        Останавливает периодическую очистку.
+        """
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
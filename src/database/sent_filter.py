@@ -0,0 +1,263 @@
+import math
+from abc import ABC, abstractmethod
+from hashlib import blake2b
+from loguru import logger
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import SentVacanciesHeadhunter
+
+
+class SentVacanciesFilter(ABC):
+    """
+    Фильтр Блума по парам (пользователь, вакансия) перед таблицей
+    отправленных вакансий. Если фильтр отвечает "нет", вакансия точно
+    не отправлялась и в базу можно не ходить; "возможно" проверяется по базе.
+
+    Размер фильтра рассчитывается по ожидаемому числу записей и допустимой
+    доле ложных срабатываний. Дочерние классы должны определить способ
+    хранения битов.
+
+    Args:
+        capacity (int): Ожидаемое число записей.
+        error_rate (float): Допустимая доля ложных срабатываний.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.items: int = 0
+        self.checks: int = 0
+        self.maybe: int = 0
+        self.false_positives: int = 0
+
+    @staticmethod
+    def make_key(telegram_id: int, vacancy_id: str) -> bytes:
+        """
+        Формирует ключ фильтра для пары (пользователь, вакансия).
+        """
+        return f"{telegram_id}:{vacancy_id}".encode()
+
+    def _get_positions(self, key: bytes) -> List[int]:
+        """
+        Номера битов ключа (двойное хеширование по одному blake2b).
+        """
+        digest = blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    async def add_many(self, keys: Iterable[Tuple[int, str]]) -> None:
+        """
+        Добавляет пары (Telegram ID, ID вакансии) в фильтр.
+
+        Args:
+            keys (Iterable[Tuple[int, str]]): Пары пользователь-вакансия.
+        """
+        positions = []
+        count = 0
+        for telegram_id, vacancy_id in keys:
+            positions.extend(self._get_positions(
+                self.make_key(telegram_id, vacancy_id)))
+            count += 1
+        if positions:
+            await self._set_bits(positions)
+            self.items += count
+
+    async def filter_maybe_sent(self, telegram_id: int, vacancy_ids: List[str]) -> List[str]:
+        """
+        Оставляет вакансии, которые могли быть отправлены пользователю.
+        Остальные точно не отправлялись.
+
+        Args:
+            telegram_id (int): Telegram ID пользователя.
+            vacancy_ids (List[str]): Проверяемые вакансии.
+
+        Returns:
+            List[str]: Вакансии, которые нужно проверить по базе.
+        """
+        if not vacancy_ids:
+            return []
+        positions = [self._get_positions(self.make_key(telegram_id, vacancy_id))
+                     for vacancy_id in vacancy_ids]
+        bits = await self._get_bits([position for key_positions in positions
+                                     for position in key_positions])
+        if bits is None:
+            return list(vacancy_ids)
+        maybe_ids = [
+            vacancy_id for i, vacancy_id in enumerate(vacancy_ids)
+            if all(bits[i * self.hash_count:(i + 1) * self.hash_count])
+        ]
+        self.checks += len(vacancy_ids)
+        self.maybe += len(maybe_ids)
+        return maybe_ids
+
+    def record_false_positives(self, count: int) -> None:
+        """
+        Учитывает ответы "возможно", которые не подтвердились в базе.
+
+        Args:
+            count (int): Количество ложных срабатываний.
+        """
+        self.false_positives += count
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Статистика фильтра: размер, заполнение, расчетная и фактическая
+        доля ложных срабатываний.
+
+        Returns:
+            Dict[str, float]: Статистика фильтра.
+        """
+        expected_rate = (1 - math.exp(-self.hash_count * self.items / self.size)) ** self.hash_count
+        negatives = self.checks - self.maybe + self.false_positives
+        return {
+            "memory_bytes": math.ceil(self.size / 8),
+            "hash_count": self.hash_count,
+            "capacity": self.capacity,
+            "items": self.items,
+            "expected_fp_rate": round(expected_rate, 6),
+            "checks": self.checks,
+            "maybe": self.maybe,
+            "false_positives": self.false_positives,
+            "fp_rate": round(self.false_positives / negatives, 6) if negatives else 0.0,
+        }
+
+    async def warm(self, session: AsyncSession, batch_size: int = 10000) -> None:
+        """
+        Заполняет фильтр из таблицы отправленных вакансий потоковым чтением.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            batch_size (int): Количество строк, читаемых за раз.
+        """
+        logger.info("Заполнение фильтра отправленных вакансий из базы...")
+        query = select(SentVacanciesHeadhunter.user_id, SentVacanciesHeadhunter.vacancy_id).execution_options(
+            yield_per=batch_size)
+        result = await session.stream(query)
+        async for rows in result.partitions():
+            await self.add_many((user_id, str(vacancy_id)) for user_id, vacancy_id in rows)
+        if self.items > self.capacity:
+            logger.warning(
+                f"Записей в фильтре ({self.items}) больше расчетного ({self.capacity}), доля ложных срабатываний выше заданной")
+        logger.info(
+            f"Фильтр отправленных вакансий заполнен: {self.get_stats()}")
+
+    async def close(self) -> None:
+        """
+        Освобождает ресурсы фильтра.
+        """
+        pass
+
+    @abstractmethod
+    async def _get_bits(self, positions: List[int]) -> Optional[List[bool]]:
+        """
+        Метод для чтения битов. None — фильтр недоступен, проверять по базе.
+        """
+        pass
+
+    @abstractmethod
+    async def _set_bits(self, positions: List[int]) -> None:
+        """
+        Метод для установки битов.
+        """
+        pass
+
+
+class MemorySentVacanciesFilter(SentVacanciesFilter):
+    """
+    Фильтр Блума в памяти процесса.
+
+    Args:
+        capacity (int): Ожидаемое число записей.
+        error_rate (float): Допустимая доля ложных срабатываний.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        super().__init__(capacity, error_rate)
+        self._bits = bytearray(math.ceil(self.size / 8))
+
+    async def _get_bits(self, positions: List[int]) -> Optional[List[bool]]:
+        bits = self._bits
+        return [bool(bits[position >> 3] & (1 << (position & 7))) for position in positions]
+
+    async def _set_bits(self, positions: List[int]) -> None:
+        bits = self._bits
+        for position in positions:
+            bits[position >> 3] |= 1 << (position & 7)
+
+
+class RedisSentVacanciesFilter(SentVacanciesFilter):
+    """
+    Фильтр Блума в Redis (битовая строка). Позволяет разделять фильтр между
+    несколькими экземплярами бота. Ошибки Redis не прерывают рассылку:
+    все вакансии в этом случае проверяются по базе.
+
+    Args:
+        capacity (int): Ожидаемое число записей.
+        error_rate (float): Допустимая доля ложных срабатываний.
+        url (str): Адрес Redis.
+        key (str): Ключ битовой строки в Redis.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, url: str, key: str = "sent_vacancies:bloom") -> None:
+        super().__init__(capacity, error_rate)
+        self.redis = Redis.from_url(url)
+        self._degraded = False
+        # Размер входит в ключ, чтобы фильтр с другими параметрами не читал чужие биты
+        self.key = f"{key}:{self.size}:{self.hash_count}"
+
+    async def _get_bits(self, positions: List[int]) -> Optional[List[bool]]:
+        if self._degraded:
+            return None
+        try:
+            pipeline = self.redis.pipeline(transaction=False)
+            for position in positions:
+                pipeline.getbit(self.key, position)
+            return [bool(bit) for bit in await pipeline.execute()]
+        except RedisError as e:
+            logger.error(f"Ошибка при чтении фильтра из Redis: {e}")
+            return None
+
+    async def _set_bits(self, positions: List[int]) -> None:
+        try:
+            pipeline = self.redis.pipeline(transaction=False)
+            for position in positions:
+                pipeline.setbit(self.key, position, 1)
+            await pipeline.execute()
+        except RedisError as e:
+            # Без записанных битов фильтр может ответить "нет" на отправленную
+            # вакансию, поэтому дальше все проверки идут через базу.
+            self._degraded = True
+            logger.error(f"Ошибка при записи фильтра в Redis, фильтр отключен: {e}")
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+
+def create_sent_vacancies_filter(backend: str, capacity: int, error_rate: float, redis_url: str) -> Optional[SentVacanciesFilter]:
+    """
+    Создает фильтр отправленных вакансий по названию бэкенда.
+
+    Args:
+        backend (str): "memory", "redis" или "none".
+        capacity (int): Ожидаемое число записей.
+        error_rate (float): Допустимая доля ложных срабатываний.
+        redis_url (str): Адрес Redis (для Redis).
+
+    Returns:
+        Optional[SentVacanciesFilter]: Фильтр или None, если он отключен.
+    """
+    if backend == "memory":
+        return MemorySentVacanciesFilter(capacity, error_rate)
+    if backend == "redis":
+        return RedisSentVacanciesFilter(capacity, error_rate, redis_url)
+    if backend == "none":
+        return None
+    raise ValueError(f"Неизвестный бэкенд фильтра: {backend}")
@@ -0,0 +1,150 @@
+import asyncio
+import time
+from loguru import logger
+from typing import Dict, Optional, Set, Tuple
+
+from database.dao import SentVacanciesHeadhunterDAO, OutboxVacancyHeadhunterDAO
+from database.database import Session
+
+
+class SentVacanciesWriter:
+    """
+    Отложенная запись отправленных вакансий: записи копятся в буфере
+    и сохраняются одним многострочным INSERT в отдельной транзакции.
+    В той же транзакции из очереди отправки (outbox) удаляются
+    подтвержденные записи.
+
+    Буфер сбрасывается при достижении max_size, раз в flush_interval секунд
+    (фоновая задача), по явному вызову flush() и при закрытии.
+    Повторы внутри буфера и уже сохраненные пары пропускаются.
+
+    Args:
+        max_size (int): Количество записей, при котором буфер сбрасывается сразу.
+        flush_interval (float): Максимальное время хранения записи в буфере (сек).
+    """
+
+    def __init__(self, max_size: int = 500, flush_interval: float = 5) -> None:
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self.flushes: int = 0
+        self.written: int = 0
+        self._pending: Set[Tuple[int, str]] = set()
+        # Записи, которые сохраняются прямо сейчас: до коммита их еще нет в
+        # таблице, поэтому проверка на повтор должна видеть их здесь
+        self._flushing: Set[Tuple[int, str]] = set()
+        self._acks: Set[int] = set()
+        self._first_added_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """
+        Запускает фоновый сброс буфера по времени.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_periodically())
+
+    def is_pending(self, telegram_id: int, vacancy_id: str) -> bool:
+        """
+        Проверяет, ожидает ли запись о вакансии сохранения.
+
+        Args:
+            telegram_id (int): Telegram ID пользователя.
+            vacancy_id (str): ID вакансии.
+
+        Returns:
+            bool: True, если запись еще в буфере или сохраняется.
+        """
+        key = (telegram_id, str(vacancy_id))
+        return key in self._pending or key in self._flushing
+
+    async def add(self, telegram_id: int, vacancy_id: str, outbox_id: Optional[int] = None) -> None:
+        """
+        Добавляет запись в буфер и сбрасывает его при переполнении.
+
+        Args:
+            telegram_id (int): Telegram ID пользователя.
+            vacancy_id (str): ID вакансии.
+            outbox_id (Optional[int]): ID записи очереди отправки, которую нужно подтвердить.
+        """
+        if not self._pending:
+            self._first_added_at = time.monotonic()
+        self._pending.add((telegram_id, str(vacancy_id)))
+        if outbox_id is not None:
+            self._acks.add(outbox_id)
+        if len(self._pending) >= self.max_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """
+        Сохраняет накопленные записи одной транзакцией.
+        При ошибке записи возвращаются в буфер для следующей попытки.
+        """
+        async with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, set()
+            acks, self._acks = self._acks, set()
+            self._flushing = pending
+            self._first_added_at = None
+            started_at = time.monotonic()
+            try:
+                async with Session() as session:
+                    await SentVacanciesHeadhunterDAO.add_many(session, [
+                        {"user_id": telegram_id, "vacancy_id": vacancy_id}
+                        for telegram_id, vacancy_id in pending
+                    ])
+                    await OutboxVacancyHeadhunterDAO.ack(session, acks)
+                    await session.commit()
+            except Exception as e:
+                logger.error(
+                    f"Ошибка при сохранении {len(pending)} отправленных вакансий: {e}")
+                if not self._pending:
+                    self._first_added_at = time.monotonic()
+                self._pending |= pending
+                self._acks |= acks
+                return
+            finally:
+                self._flushing = set()
+            self.flushes += 1
+            self.written += len(pending)
+            logger.info(
+                f"Сохранено {len(pending)} отправленных вакансий за {time.monotonic() - started_at:.3f} сек.")
+
+    async def _flush_periodically(self) -> None:
+        """
+        Сбрасывает буфер, если самая старая запись ждет дольше flush_interval.
+        """
+        while True:
+            await asyncio.sleep(self.flush_interval / 2)
+            if self._first_added_at is not None and \
+                    time.monotonic() - self._first_added_at >= self.flush_interval:
+                await self.flush()
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Статистика записи: количество сбросов, записей и ожидающих записей.
+
+        Returns:
+            Dict[str, int]: Статистика буфера.
+        """
+        return {
+            "flushes": self.flushes,
+            "written": self.written,
+            "pending": len(self._pending),
+        }
+
+    async def close(self) -> None:
+        """
+        Останавливает фоновый сброс и сохраняет оставшиеся записи.
+        """
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        logger.info(
+            f"Запись отправленных вакансий остановлена. Статистика: {self.get_stats()}")
@@ -1,20 +1,36 @@
 from loguru import logger
+from sqlalchemy import String, cast, literal, select, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
 from database.models import (
     Location, Salary,
     Grade, Speciality
 )
-from database.dao import (
-    LocationDAO, SalaryDAO,
-    GradeDAO, SpecialityDAO
-)
+
+
+class UserSearchSettings(NamedTuple):
+    """
+    Неизменяемые настройки поиска пользователя в текстовом виде.
+    """
+    locations: Tuple[str, ...]
+    specialities: Tuple[str, ...]
+    grades: Tuple[str, ...]
+    salary: Optional[int]
 
 
 class UserSettingsServices:
     """Класс для получения пользовательских настроек из базы данных."""
 
+    # Вид настройки, модель и колонка значения для загрузки одним запросом
+    _SETTINGS_COLUMNS = (
+        ("location", Location, Location.location),
+        ("speciality", Speciality, Speciality.speciality),
+        ("grade", Grade, Grade.grade),
+        ("salary", Salary, Salary.salary),
+    )
+
     def __init__(self, session: AsyncSession):
         """
         Args:
@@ -22,49 +38,85 @@ class UserSettingsServices:
         """
         self.session = session
 
-    async def get_user_settings_by_telegram_id(
-        self, telegram_id: str
-    ) -> tuple[List[Location], List[Speciality], List[Grade], List[Salary]]:
+    async def _load_settings(self, telegram_id: Optional[int] = None) -> Dict[int, UserSearchSettings]:
+        """
+        Загрузка настроек одним запросом: строки всех таблиц настроек
+        объединяются через UNION ALL в пары (вид настройки, значение).
+
+        Args:
+            telegram_id (Optional[int]): Загрузить настройки только этого пользователя.
+
+        Returns:
+            Dict[int, UserSearchSettings]: Настройки по Telegram ID пользователя.
+        """
+        queries = []
+        for kind, model, column in self._SETTINGS_COLUMNS:
+            query = select(
+                model.user_id.label("user_id"),
+                literal(kind).label("kind"),
+                cast(column, String).label("value"),
+                model.id.label("id"))
+            if telegram_id is not None:
+                query = query.where(model.user_id == telegram_id)
+            queries.append(query)
+        result = await self.session.execute(union_all(*queries).order_by("id"))
+
+        values: Dict[int, Dict[str, List[str]]] = defaultdict(lambda: defaultdict(list))
+        for row in result:
+            values[row.user_id][row.kind].append(row.value)
+        return {
+            user_id: UserSearchSettings(
+                tuple(user_values["location"]),
+                tuple(user_values["speciality"]),
+                tuple(user_values["grade"]),
+                # При нескольких записях зарплаты действует последняя
+                int(float(user_values["salary"][-1])) if user_values["salary"] else None,
+            )
+            for user_id, user_values in values.items()
+        }
+
+    async def get_user_settings(self, telegram_id: int) -> UserSearchSettings:
         """
-        Получение настроек пользователя по telegram_id.
+        Получение настроек пользователя одним запросом.
 
         Args:
-            telegram_id (str): Идентификатор пользователя Telegram.
+            telegram_id (int): Идентификатор пользователя Telegram.
 
         Returns:
-            tuple: Кортеж из списков Location, Speciality, Grade и одного объекта Salary.
+            UserSearchSettings: Настройки пользователя (пустые, если не сохранены).
         """
         try:
             logger.info(
                 f"Получение настроек для пользователя с ID: {telegram_id}")
-            filter_params = {"user_id": telegram_id}
-
-            locations = await LocationDAO.find_all(self.session, filter_params)
-            grades = await GradeDAO.find_all(self.session, filter_params)
-            specialities = await SpecialityDAO.find_all(self.session, filter_params)
-            salary = await SalaryDAO.find_one_or_none(self.session, filter_params)
-
+            settings = (await self._load_settings(telegram_id)).get(
+                telegram_id, UserSearchSettings((), (), (), None))
             logger.info(
                 f"Настройки успешно получены для пользователя с ID: {telegram_id}")
-            return locations, specialities, grades, salary
+            return settings
         except Exception as e:
             logger.error(
                 f"Ошибка при получении настроек для пользователя с ID {telegram_id}: {e}")
             raise
 
-    def get_listed_data_from_user_settings(self, locations: List[Location], specialities:  List[Speciality], grades: List[Grade], salary: List[Salary]):
+    async def get_all_users_settings(self) -> Dict[int, UserSearchSettings]:
         """
+        Получение настроек всех пользователей одним запросом.
+        Пользователи без сохраненной зарплаты (не завершившие настройку) пропускаются.
 
-        Получение настроек в виде списка с текстовой информацией.
-
-        Args:
-            locations (List[Location]): объекты локаций
-            specialities (List[Speciality]): объекты специальностей
-            grades (List[Grade]): объекты грейдов
-            salary (List[Salary]): зарплата
+        Returns:
+            Dict[int, UserSearchSettings]: Настройки по Telegram ID пользователя.
         """
-        locations = [obj.location for obj in locations]
-        grades = [obj.grade for obj in grades]
-        specialities = [obj.speciality for obj in specialities]
-        salary_value = int(salary.salary) if salary else None
-        return locations, specialities, grades, salary_value
+        try:
+            logger.info("Получение настроек всех пользователей")
+            users_settings = {
+                telegram_id: settings
+                for telegram_id, settings in (await self._load_settings()).items()
+                if settings.salary is not None
+            }
+            logger.info(
+                f"Настройки получены для {len(users_settings)} пользователей")
+            return users_settings
+        except Exception as e:
+            logger.error(
+                f"Ошибка при получении настроек всех пользователей: {e}")
+            raise
@@ -53,12 +53,9 @@ async def cmd_start(message: Message, state: FSMContext, session_without_commit:
     logger.info(f"Пользователь {user_id} вызвал команду: {message.text}")
 
     await state.clear()
-    services = UserSettingsServices(
-        session_without_commit)
-    settings = await services.get_user_settings_by_telegram_id(user_id)
-    if settings[3]:
-        locations, specialties, grades, salary = services.get_listed_data_from_user_settings(
-            *settings)
+    locations, specialties, grades, salary = await UserSettingsServices(
+        session_without_commit).get_user_settings(user_id)
+    if salary:
         text = (
             f"✅ *Твои настройки:*\n\n"
             f"🌍 Локации: {', '.join(locations)}\n"
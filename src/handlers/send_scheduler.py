@@ -0,0 +1,259 @@
+import asyncio
+import random
+import time
+from collections import deque
+from loguru import logger
+from typing import Awaitable, Callable, Deque, Dict, Optional, Set, TypeVar
+from aiogram.exceptions import (
+    TelegramNetworkError, TelegramRetryAfter, TelegramServerError
+)
+
+from collectors.rate_limiter import TokenBucket
+
+
+T = TypeVar("T")
+
+
+class SendJob:
+    """
+    Отправка в очереди планировщика.
+    """
+
+    __slots__ = ("send", "future", "queued_at", "attempt")
+
+    def __init__(self, send: Callable[[], Awaitable], future: asyncio.Future) -> None:
+        self.send = send
+        self.future = future
+        self.queued_at = time.monotonic()
+        self.attempt = 0
+
+
+class TelegramSendScheduler:
+    """
+    Общий планировщик отправки сообщений в Telegram с учетом лимитов Bot API:
+    не больше global_rate сообщений в секунду на бота и chat_rate в один чат.
+
+    У каждого чата своя очередь, чаты обслуживаются по кругу, поэтому
+    пользователь с большим числом вакансий не задерживает остальных.
+    Отправки выполняются в отдельных задачах, чтобы медленный ответ
+    Telegram не снижал общую скорость.
+
+    При флуд-контроле (TelegramRetryAfter) чат приостанавливается на
+    запрошенное время, а если ограничение пришло сразу в нескольких чатах —
+    весь бот. Временные ошибки сети и сервера повторяются с экспоненциальной
+    задержкой. Повторная отправка встает в начало очереди своего чата.
+    После max_retries неудачных повторов или при постоянной ошибке
+    исключение передается вызывающему.
+
+    Args:
+        global_rate (float): Допустимое число сообщений в секунду на бота.
+        chat_rate (float): Допустимое число сообщений в секунду в один чат.
+        max_retries (int): Максимальное число повторов одной отправки.
+        backoff_base (float): Базовая задержка перед повтором (сек).
+        backoff_max (float): Максимальная задержка перед повтором (сек).
+    """
+
+    # Флуд-контроль в разных чатах за это время считается общим для бота (сек)
+    _GLOBAL_FLOOD_WINDOW = 1.0
+
+    def __init__(
+        self,
+        global_rate: float = 30,
+        chat_rate: float = 1,
+        max_retries: int = 3,
+        backoff_base: float = 1,
+        backoff_max: float = 60,
+    ) -> None:
+        self.bucket = TokenBucket(global_rate)
+        self.chat_interval = 1 / chat_rate
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.sent: int = 0
+        self.retries: int = 0
+        self.flood_waits: int = 0
+        self.failed: int = 0
+        self.max_wait: float = 0.0
+        self._last_flood: Optional[tuple] = None
+        self._queues: Dict[int, Deque[SendJob]] = {}
+        self._ready: Deque[int] = deque()
+        self._next_at: Dict[int, float] = {}
+        self._wakeup = asyncio.Event()
+        self._running: Set[asyncio.Task] = set()
+        self._worker: Optional[asyncio.Task] = None
+
+    @property
+    def queue_size(self) -> int:
+        """Количество сообщений, ожидающих отправки."""
+        return sum(len(queue) for queue in self._queues.values())
+
+    def start(self) -> None:
+        """
+        Запускает обработку очереди, если она еще не запущена.
+        """
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def submit(self, chat_id: int, send: Callable[[], Awaitable[T]]) -> T:
+        """
+        Ставит отправку в очередь чата и ожидает ее выполнения.
+
+        Args:
+            chat_id (int): ID чата.
+            send (Callable[[], Awaitable[T]]): Функция, выполняющая отправку.
+
+        Returns:
+            T: Результат отправки. Исключение отправки пробрасывается вызывающему.
+        """
+        self.start()
+        job = SendJob(send, asyncio.get_running_loop().create_future())
+        self._enqueue(chat_id, job)
+        return await job.future
+
+    def _enqueue(self, chat_id: int, job: SendJob, first: bool = False) -> None:
+        """
+        Добавляет отправку в очередь чата (повторы — в начало очереди).
+        """
+        queue = self._queues.get(chat_id)
+        if queue is None:
+            queue = self._queues[chat_id] = deque()
+            self._ready.append(chat_id)
+        if first:
+            queue.appendleft(job)
+        else:
+            queue.append(job)
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        """
+        Выбирает следующий чат по кругу и отправляет его сообщение,
+        когда это позволяют общий и початовый лимиты.
+        """
+        while True:
+            if not self._ready:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            now = time.monotonic()
+            chat_id = None
+            for _ in range(len(self._ready)):
+                candidate = self._ready.popleft()
+                if self._next_at.get(candidate, 0) <= now:
+                    chat_id = candidate
+                    break
+                self._ready.append(candidate)
+            if chat_id is None:
+                delay = min(self._next_at[candidate]
+                            for candidate in self._ready) - now
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self.bucket.acquire()
+            queue = self._queues[chat_id]
+            job = queue.popleft()
+            if queue:
+                self._ready.append(chat_id)
+            else:
+                del self._queues[chat_id]
+            self._next_at[chat_id] = max(self._next_at.get(chat_id, 0),
+                                         time.monotonic() + self.chat_interval)
+            self.max_wait = max(self.max_wait, time.monotonic() - job.queued_at)
+            if job.future.cancelled():
+                continue
+            task = asyncio.create_task(self._send(chat_id, job))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+            self._forget_idle_chats()
+
+    async def _send(self, chat_id: int, job: SendJob) -> None:
+        """
+        Выполняет отправку и передает результат ожидающему
+        или ставит отправку на повтор.
+        """
+        try:
+            result = await job.send()
+        except Exception as e:
+            delay = self._get_retry_delay(chat_id, e, job.attempt)
+            if delay is not None and job.attempt < self.max_retries:
+                job.attempt += 1
+                self.retries += 1
+                logger.warning(
+                    f"Повтор отправки в чат {chat_id} через {delay:.1f} сек. (попытка {job.attempt}/{self.max_retries}): {e}")
+                self._next_at[chat_id] = max(self._next_at.get(chat_id, 0),
+                                             time.monotonic() + delay)
+                self._enqueue(chat_id, job, first=True)
+                return
+            self.failed += 1
+            if not job.future.done():
+                job.future.set_exception(e)
+            return
+        self.sent += 1
+        if not job.future.done():
+            job.future.set_result(result)
+
+    def _get_retry_delay(self, chat_id: int, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Задержка перед повтором отправки или None, если ошибка постоянная.
+        При флуд-контроле в нескольких чатах подряд приостанавливается весь бот.
+        """
+        if isinstance(error, TelegramRetryAfter):
+            self.flood_waits += 1
+            now = time.monotonic()
+            if self._last_flood and self._last_flood[0] != chat_id and \
+                    now - self._last_flood[1] < self._GLOBAL_FLOOD_WINDOW:
+                logger.warning(
+                    f"Флуд-контроль Telegram, отправка приостановлена на {error.retry_after} сек.")
+                self.bucket.pause(error.retry_after)
+            self._last_flood = (chat_id, now)
+            return float(error.retry_after)
+        if isinstance(error, (TelegramNetworkError, TelegramServerError, asyncio.TimeoutError)):
+            return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        return None
+
+    def _forget_idle_chats(self) -> None:
+        """
+        Удаляет время следующей отправки у чатов, для которых лимит уже не действует.
+        """
+        if len(self._next_at) < 10000:
+            return
+        now = time.monotonic()
+        self._next_at = {chat_id: next_at for chat_id, next_at in self._next_at.items()
+                         if next_at > now}
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Статистика отправки: отправлено, повторов, флуд-контролей, ошибок,
+        в очереди, максимальное ожидание.
+
+        Returns:
+            Dict[str, float]: Статистика планировщика.
+        """
+        return {
+            "sent": self.sent,
+            "retries": self.retries,
+            "flood_waits": self.flood_waits,
+            "failed": self.failed,
+            "queued": self.queue_size,
+            "max_wait": round(self.max_wait, 3),
+        }
+
+    async def close(self) -> None:
+        """
+        Останавливает обработку очереди и дожидается начатых отправок.
+        """
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        logger.info(
+            f"Планировщик отправки остановлен. Статистика: {self.get_stats()}")
@@ -6,6 +6,7 @@ from aiogram.fsm.state import State, StatesGroup
 from aiogram.types import Message, CallbackQuery
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from collectors.subscription_index import SubscriptionIndex
 from keyboards.markups import get_inline_markup_for_select
 from database.dao import UserDAO, LocationDAO, SalaryDAO, SpecialityDAO, GradeDAO
 from constants import LOCATION_CHOICES, GRADE_CHOICES, SPECIALTY_CHOICES, SALARY_CHOICES
@@ -224,7 +225,7 @@ async def grade_chosen(callback: CallbackQuery, state: FSMContext):
 
 
 @router.callback_query(UserSettings.salary)
-async def salary_chosen(callback: CallbackQuery, state: FSMContext, session_with_commit: AsyncSession):
+async def salary_chosen(callback: CallbackQuery, state: FSMContext, session_with_commit: AsyncSession, subscription_index: SubscriptionIndex):
     user_id = callback.from_user.id
     logger.info(f"Пользователь {user_id} выбрал зарплату: {callback.data}.")
     data = await state.get_data()
@@ -295,6 +296,10 @@ async def salary_chosen(callback: CallbackQuery, state: FSMContext, session_with
                 "user_id": user.telegram_id})
             await SalaryDAO.add(session_with_commit, values={"user_id": user.telegram_id, "salary": user_settings["salary"]})
 
+            subscription_index.update(
+                user.telegram_id, user_settings["locations"], user_settings["specialties"],
+                user_settings["grades"], int(user_settings["salary"]))
+
             result = (
                 f"✅ *Настройки сохранены!*\n\n"
                 f"🌍 Локации: {', '.join(user_settings['locations'])}\n"
@@ -1,66 +1,85 @@
 from loguru import logger
 import asyncio
-from typing import List, Dict, Optional, Tuple
+import time
+from collections import defaultdict
+from typing import List, Dict, Optional, Set, Tuple
 from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 
-from collectors.headhunter import HeadhunterVacanciesParser
+from settings import (
+    HH_INITIAL_WINDOW_MINUTES, HH_WATERMARK_OVERLAP_MINUTES, HH_MAX_LOOKBACK_HOURS,
+    OUTBOX_BATCH_SIZE, OUTBOX_CLAIM_TIMEOUT,
+    PIPELINE_FETCH_WORKERS, PIPELINE_MATCH_WORKERS, PIPELINE_SEND_WORKERS,
+    PIPELINE_MATCH_QUEUE_SIZE, PIPELINE_SEND_QUEUE_SIZE,
+    POLL_INTERVAL, POLL_TICK, POLL_MAX_QUERIES_PER_TICK, POLL_REFRESH_INTERVAL,
+    POLL_MAX_INTERVAL, POLL_TARGET_VACANCIES, POLL_RATE_SMOOTHING
+)
+from collectors.cache import ResponseCache
+from collectors.headhunter import VacancyHeadhunter
+from collectors.http_client import HttpClient
+from collectors.planner import HeadhunterQueryPlanner
+from collectors.query_scheduler import QueryScheduler
+from collectors.rate_limiter import RateLimiter
+from collectors.subscription_index import SubscriptionIndex, get_scope
 from params_generators.headhunter import ParamsGeneratorHeadhunter
+from params_generators.utils import make_query_id
 from database.dao import (
-    UserDAO, SentVacanciesHeadhunterDAO
+    SentVacanciesHeadhunterDAO, OutboxVacancyHeadhunterDAO,
+    FailedVacancyHeadhunterDAO, QueryWatermarkHeadhunterDAO
 )
-from database.database import Session
-from database.services import UserSettingsServices
-from database.models import User
+from database.database import QueryCounter, Session, query_counter
+from database.sent_filter import SentVacanciesFilter
+from database.sent_writer import SentVacanciesWriter
+from database.services import UserSearchSettings, UserSettingsServices
 from keyboards.markups import get_inline_markup_send_vacancy
+from handlers.send_scheduler import TelegramSendScheduler
 from handlers.utils import clean_text_from_html
 
 
 class VacanciesFinder:
-    """Поиск вакансий для пользователя, чтобы отправить их в чат."""
+    """Формирование параметров поиска вакансий для пользователя."""
 
-    def __init__(self, session: AsyncSession, telegram_id: str) -> None:
+    def __init__(self, session: Optional[AsyncSession], telegram_id: str, settings: Optional[UserSearchSettings] = None) -> None:
         """
         Args:
-            session (AsyncSession): Сессия SQLAlchemy.
+            session (Optional[AsyncSession]): Сессия SQLAlchemy (не нужна, если настройки переданы).
             telegram_id (str): Идентификатор пользователя Telegram.
+            settings (Optional[UserSearchSettings]): Заранее загруженные настройки пользователя.
         """
         self.session = session
         self.telegram_id = telegram_id
+        self.settings = settings
         if not self.telegram_id:
             raise ValueError("telegram_id не должен быть пустым!")
 
-    async def _get_listed_data_from_user_settings_and_last_date_headhunter(self) -> Tuple[List[str], List[str], List[str], int, Optional[str]]:
+    async def _get_listed_data_from_user_settings_headhunter(self) -> UserSearchSettings:
         """
-        Формирует параметры поиска: локации, специальности, грейды, зарплата, дата.
+        Формирует параметры поиска: локации, специальности, грейды, зарплата.
 
         Returns:
-            Tuple[List[str], List[str], List[str], int, Optional[str]]:
-                - Списки локаций, специальностей, грейдов,
-                - Зарплата (int),
-                - Дата последнего сообщения (str или None).
+            UserSearchSettings: Настройки пользователя, загруженные одним запросом.
         """
-        services = UserSettingsServices(self.session)
-        settings = await services.get_user_settings_by_telegram_id(self.telegram_id)
-        locations, specialities, grades, salary_value = services.get_listed_data_from_user_settings(
-            *settings)
-        date = datetime.now() - timedelta(minutes=10)
-        return locations, specialities, grades, salary_value, date
+        if self.settings is not None:
+            return self.settings
+        return await UserSettingsServices(self.session).get_user_settings(self.telegram_id)
 
-    async def _generate_params_headhunter(self) -> List[Dict]:
+    async def generate_params_headhunter(self) -> List[Dict]:
         """
-        Генерация параметров поиска для HeadHunter.
+        Генерация параметров поиска для HeadHunter (без даты публикации,
+        она задается планировщиком запросов на весь цикл).
 
         Returns:
             List[Dict]: Список словарей с параметрами для поиска вакансий.
         """
         try:
             logger.info("Формирование параметров для поиска вакансий...")
-            locations, specialities, grades, salary, date = await self._get_listed_data_from_user_settings_and_last_date_headhunter()
+            locations, specialities, grades, salary = await self._get_listed_data_from_user_settings_headhunter()
             headhunter_params = [
                 ParamsGeneratorHeadhunter().get_params(
-                    locations, specialities, grade, salary, date)
+                    locations, specialities, grade, salary)
                 for grade in grades
             ]
             logger.info(f"Параметров для поиска: {len(headhunter_params)}")
@@ -69,196 +88,721 @@ class VacanciesFinder:
             logger.error(f"Ошибка при формировании параметров: {e}")
             raise
 
-    async def find_vacancies_headhunter(self) -> List[Dict]:
-        """
-        Поиск вакансий с помощью HeadHunter.
-
-        Returns:
-            List[Dict]: Список найденных вакансий.
-        """
-        headhunter_params = await self._generate_params_headhunter()
-        vacancies = []
-        for params in headhunter_params:
-            parser = HeadhunterVacanciesParser(params=params)
-            vacancies_part = await parser.get_all_vacancies()
-            if vacancies_part:
-                logger.info(
-                    f"Найдено {len(vacancies_part)} вакансий по параметрам: {params}")
-                vacancies.extend(vacancies_part)
-        return vacancies
-
-    async def find_vacancies(self) -> List[Dict]:
-        """
-        Общий метод для поиска всех доступных вакансий.
-
-        Returns:
-            List[Dict]: Список всех найденных вакансий.
-        """
-        return await self.find_vacancies_headhunter()
-
 
 class VacanciesSender:
     """Отправка найденных вакансий пользователям Telegram."""
 
-    def __init__(self, bot: Bot, max_concurrent_users: int = 20):
+    _END = object()
+
+    def __init__(
+        self,
+        bot: Bot,
+        http_client: HttpClient,
+        cache: Optional[ResponseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        index: Optional[SubscriptionIndex] = None,
+        sent_filter: Optional[SentVacanciesFilter] = None,
+        sent_writer: Optional[SentVacanciesWriter] = None,
+        send_scheduler: Optional[TelegramSendScheduler] = None,
+        query_scheduler: Optional[QueryScheduler] = None,
+        dedup_batch_size: int = 1000,
+    ):
         """
         Args:
             bot (Bot): Экземпляр Telegram-бота.
-            max_concurrent_users (int): Максимальное число одновременно обрабатываемых пользователей.
+            http_client (HttpClient): Общий HTTP-клиент для коллекторов.
+            cache (Optional[ResponseCache]): Кеш ответов HeadHunter.
+            rate_limiter (Optional[RateLimiter]): Общий ограничитель запросов к HeadHunter.
+            index (Optional[SubscriptionIndex]): Индекс подписок пользователей для раздачи вакансий.
+            sent_filter (Optional[SentVacanciesFilter]): Фильтр Блума отправленных вакансий перед базой.
+            sent_writer (Optional[SentVacanciesWriter]): Буфер записи отправленных вакансий.
+                Если не передан, создается свой.
+            send_scheduler (Optional[TelegramSendScheduler]): Общий планировщик отправки сообщений.
+                Если не передан, создается свой.
+            query_scheduler (Optional[QueryScheduler]): Расписание опроса запросов.
+                Если не передано, создается свое.
+            dedup_batch_size (int): Сколько вакансий пользователя проверяется на повтор одним запросом.
         """
         self.bot = bot
-        self.semaphore = asyncio.Semaphore(max_concurrent_users)
-
-    async def is_vacancy_sending(self, session: AsyncSession, vacancy_id: str, telegram_id: int) -> bool:
+        self.http_client = http_client
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.index = index
+        self.sent_filter = sent_filter
+        self.sent_writer = sent_writer or SentVacanciesWriter()
+        self.send_scheduler = send_scheduler or TelegramSendScheduler()
+        self.query_scheduler = query_scheduler or QueryScheduler(
+            POLL_INTERVAL, POLL_MAX_QUERIES_PER_TICK, POLL_MAX_INTERVAL,
+            POLL_TARGET_VACANCIES, POLL_RATE_SMOOTHING)
+        self.dedup_batch_size = dedup_batch_size
+        self.catalog: Dict[str, Tuple[Dict, Set[int]]] = {}
+        self.user_queries: Dict[int, List[str]] = {}
+        self.query_counter = QueryCounter()
+        self.db_queries: Dict[str, int] = {}
+        self.query_estimates: Dict[str, int] = {}
+        self.queue_depths: Dict[str, int] = {}
+        self.send_queue = asyncio.Queue(maxsize=PIPELINE_SEND_QUEUE_SIZE)
+        self._send_scheduled: Set[int] = set()
+        self._send_workers: List[asyncio.Task] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def filter_sent_vacancies(self, session: AsyncSession, vacancies: List[VacancyHeadhunter], telegram_id: int) -> List[VacancyHeadhunter]:
         """
-        Проверка, была ли вакансия уже отправлена пользователю.
+        Отбрасывает вакансии, которые уже отправлялись пользователю
+        (в том числе еще не сохраненные из буфера записи) или были
+        перенесены в неотправленные.
+        Проверка выполняется одним запросом на всю пачку вакансий, а при
+        наличии фильтра — только для вакансий, на которые фильтр ответил "возможно".
 
         Args:
             session (AsyncSession): Сессия SQLAlchemy.
-            vacancy_id (str): ID вакансии.
+            vacancies (List[VacancyHeadhunter]): Вакансии для проверки.
             telegram_id (int): Telegram ID пользователя.
 
         Returns:
-            bool: True, если уже отправлялась, иначе False.
+            List[VacancyHeadhunter]: Еще не отправленные вакансии.
         """
         try:
-            logger.info(f"Проверка вакансии {vacancy_id}")
-            filter_ = {"user_id": telegram_id, "vacancy_id": vacancy_id}
-            vacancy = await SentVacanciesHeadhunterDAO.get_last_record(session, filter_)
-            if vacancy:
-                logger.info(f"Вакансия {vacancy_id} уже была отправлена")
-                return True
-            return False
+            vacancies = [vacancy for vacancy in vacancies
+                         if not self.sent_writer.is_pending(telegram_id, vacancy.id)]
+            vacancy_ids = [vacancy.id for vacancy in vacancies]
+            if self.sent_filter:
+                vacancy_ids = await self.sent_filter.filter_maybe_sent(telegram_id, vacancy_ids)
+            if not vacancy_ids:
+                return vacancies
+            sent_ids = await SentVacanciesHeadhunterDAO.get_sent_vacancy_ids(
+                session, telegram_id, vacancy_ids)
+            if self.sent_filter:
+                self.sent_filter.record_false_positives(
+                    len(vacancy_ids) - len(sent_ids))
+            return [vacancy for vacancy in vacancies if vacancy.id not in sent_ids]
         except Exception as e:
-            logger.error(f"Ошибка при проверке вакансии: {e}")
+            logger.error(f"Ошибка при проверке вакансий: {e}")
             raise
 
     @staticmethod
-    def generate_message_for_vacancy(vacancy: Dict) -> str:
+    def generate_message_for_vacancy(vacancy: VacancyHeadhunter) -> str:
         """
         Генерация текстового сообщения для вакансии.
 
         Args:
-            vacancy (Dict): Данные вакансии.
+            vacancy (VacancyHeadhunter): Данные вакансии.
 
         Returns:
             str: Сформированное сообщение.
         """
-        if vacancy['salary_from'] and vacancy['salary_to']:
-            salary_string = f"{vacancy['salary_from']} - {vacancy['salary_to']} {vacancy['salary_currency']}"
-        elif vacancy['salary_from']:
-            salary_string = f"{vacancy['salary_from']} {vacancy['salary_currency']}"
-        elif vacancy['salary_to']:
-            salary_string = f"{vacancy['salary_to']} {vacancy['salary_currency']}"
+        if vacancy.salary_from and vacancy.salary_to:
+            salary_string = f"{vacancy.salary_from} - {vacancy.salary_to} {vacancy.salary_currency}"
+        elif vacancy.salary_from:
+            salary_string = f"{vacancy.salary_from} {vacancy.salary_currency}"
+        elif vacancy.salary_to:
+            salary_string = f"{vacancy.salary_to} {vacancy.salary_currency}"
         else:
             salary_string = "Зарплата не указана"
 
         return (
-            f"*{vacancy['name']}* @ *{vacancy['employer']}*\n\n"
+            f"*{vacancy.name}* @ *{vacancy.employer}*\n\n"
             f"💰 {salary_string}\n"
-            f"📍 {vacancy['location']}\n\n"
-            f"Требуемые навыки: {clean_text_from_html(vacancy['description'])}\n\n"
-            f"Обязанности: {clean_text_from_html(vacancy['responsibility'])}"
+            f"📍 {vacancy.location}\n\n"
+            f"Требуемые навыки: {clean_text_from_html(vacancy.description)}\n\n"
+            f"Обязанности: {clean_text_from_html(vacancy.responsibility)}"
         )
 
-    async def vacancy_sending(self, vacancy: Dict, telegram_id: int) -> None:
+    async def vacancy_sending(self, record: Row) -> None:
         """
-        Отправка вакансии пользователю через Telegram.
+        Отправка вакансии из очереди пользователю через Telegram.
 
         Args:
-            vacancy (Dict): Вакансия.
-            telegram_id (int): Telegram ID пользователя.
+            record (Row): Запись очереди отправки (id, user_id, vacancy_id, message, link).
 
         Returns:
             None
         """
         try:
             logger.info(
-                f"Отправка вакансии {vacancy['id']} пользователю {telegram_id}")
-            message = self.generate_message_for_vacancy(vacancy)
+                f"Отправка вакансии {record.vacancy_id} пользователю {record.user_id}")
             await self.bot.send_message(
-                telegram_id,
-                message,
-                reply_markup=get_inline_markup_send_vacancy(vacancy['link']),
+                record.user_id,
+                record.message,
+                reply_markup=get_inline_markup_send_vacancy(record.link),
                 parse_mode="Markdown"
             )
             logger.info(
-                f"Вакансия {vacancy['id']} отправлена пользователю {telegram_id}")
+                f"Вакансия {record.vacancy_id} отправлена пользователю {record.user_id}")
         except Exception as e:
             logger.error(f"Ошибка при отправке вакансии: {e}")
             raise
 
-    async def vacancy_saving(self, session: AsyncSession, vacancy: Dict, telegram_id: int) -> None:
+    async def vacancy_saving(self, record: Row) -> None:
         """
-        Сохранение информации о том, что вакансия была отправлена.
+        Сохранение информации о том, что вакансия была отправлена,
+        и подтверждение записи очереди. Запись попадает в буфер
+        и сохраняется вместе с другими.
 
         Args:
-            session (AsyncSession): Сессия SQLAlchemy.
-            vacancy (Dict): Вакансия.
+            record (Row): Запись очереди отправки.
+
+        Returns:
+            None
+        """
+        vacancy_id = str(record.vacancy_id)
+        await self.sent_writer.add(record.user_id, vacancy_id, record.id)
+        if self.sent_filter:
+            await self.sent_filter.add_many([(record.user_id, vacancy_id)])
+
+    async def vacancy_dead_letter(self, records: List[Row], error: Exception) -> None:
+        """
+        Перенос вакансий, которые не удалось отправить, из очереди
+        в таблицу неотправленных для разбора.
+
+        Вакансии также отмечаются в таблице и фильтре отправленных как
+        обработанные: иначе каждый опрос в пределах перекрытия отметки
+        находил бы их снова и повторял заведомо неудачную отправку.
+
+        Args:
+            records (List[Row]): Записи очереди отправки.
+            error (Exception): Ошибка отправки.
+
+        Returns:
+            None
+        """
+        for record in records:
+            logger.error(
+                f"Вакансия {record.vacancy_id} не отправлена пользователю {record.user_id}: {error}")
+        async with Session() as session:
+            for record in records:
+                await FailedVacancyHeadhunterDAO.add(session, {
+                    "user_id": record.user_id,
+                    "vacancy_id": record.vacancy_id,
+                    "error": f"{type(error).__name__}: {error}",
+                })
+            await SentVacanciesHeadhunterDAO.add_many(session, [
+                {"user_id": record.user_id, "vacancy_id": record.vacancy_id}
+                for record in records
+            ])
+            await OutboxVacancyHeadhunterDAO.ack(session, [record.id for record in records])
+            await session.commit()
+        if self.sent_filter:
+            await self.sent_filter.add_many([
+                (record.user_id, str(record.vacancy_id)) for record in records])
+
+    async def enqueue_vacancies(self, vacancies: List[VacancyHeadhunter], telegram_id: int) -> None:
+        """
+        Добавление вакансий пользователя в очередь отправки (outbox).
+        Сообщения формируются сразу, чтобы после перезапуска отправить их без повторного поиска.
+
+        Args:
+            vacancies (List[VacancyHeadhunter]): Вакансии пользователя.
             telegram_id (int): Telegram ID пользователя.
 
         Returns:
             None
         """
-        values = {"user_id": telegram_id, "vacancy_id": str(vacancy['id'])}
-        await SentVacanciesHeadhunterDAO.add(session, values)
+        async with Session() as session:
+            await OutboxVacancyHeadhunterDAO.enqueue(session, [
+                {
+                    "user_id": telegram_id,
+                    "vacancy_id": int(vacancy.id),
+                    "message": self.generate_message_for_vacancy(vacancy),
+                    "link": vacancy.link,
+                }
+                for vacancy in vacancies
+            ])
+            await session.commit()
+
+    async def send_records(self, records: List[Row]) -> None:
+        """
+        Отправка записей очереди. Записи разных пользователей отправляются
+        параллельно, одного пользователя — по порядку.
 
-    async def process_user(self, session: AsyncSession, user: User, timeout: int = 30) -> None:
+        Вакансия, которую не удалось отправить после повторов, переносится
+        в таблицу неотправленных, и отправка продолжается со следующей.
+        Если пользователь заблокировал бота, туда же переносятся все его записи.
+
+        Args:
+            records (List[Row]): Захваченные записи очереди.
+
+        Returns:
+            None
         """
-        Обработка одного пользователя — поиск и отправка вакансий.
+        users_records: Dict[int, List[Row]] = defaultdict(list)
+        for record in records:
+            users_records[record.user_id].append(record)
+        await asyncio.gather(*(self._send_user_records(user_records)
+                               for user_records in users_records.values()))
+
+    async def _send_user_records(self, records: List[Row]) -> None:
+        for i, record in enumerate(records):
+            try:
+                await self.send_scheduler.submit(
+                    record.user_id,
+                    lambda record=record: asyncio.wait_for(
+                        self.vacancy_sending(record), timeout=10))
+            except TelegramForbiddenError as e:
+                logger.warning(
+                    f"Пользователь {record.user_id} недоступен, отправка прекращена")
+                await self.vacancy_dead_letter(records[i:], e)
+                return
+            except Exception as e:
+                await self.vacancy_dead_letter([record], e)
+                continue
+            await self.vacancy_saving(record)
+
+    async def send_outbox_batch(self, telegram_id: Optional[int] = None) -> bool:
+        """
+        Отправка одной пачки свободных записей очереди: захватывается до
+        OUTBOX_BATCH_SIZE записей, которые подтверждаются после отправки.
+
+        Args:
+            telegram_id (Optional[int]): Отправлять записи только этого пользователя.
+
+        Returns:
+            bool: True, если пачка заполнена целиком и в очереди могут остаться записи.
+        """
+        async with Session() as session:
+            records = await OutboxVacancyHeadhunterDAO.claim(
+                session, OUTBOX_BATCH_SIZE, telegram_id)
+            await session.commit()
+        if not records:
+            return False
+        await self.send_records(records)
+        await self.sent_writer.flush()
+        return len(records) >= OUTBOX_BATCH_SIZE
+
+    async def resume_outbox(self, claim_timeout: float = OUTBOX_CLAIM_TIMEOUT) -> None:
+        """
+        Возвращает в очередь записи, захваченные дольше claim_timeout секунд
+        назад (например, до перезапуска бота), и передает отправку всех
+        свободных записей стадии отправки, не дожидаясь ее.
+
+        Args:
+            claim_timeout (float): Время на отправку захваченной записи (сек).
+
+        Returns:
+            None
+        """
+        async with Session() as session:
+            await OutboxVacancyHeadhunterDAO.release_stale(session, claim_timeout)
+            await session.commit()
+        self.start_send_workers()
+        await self.schedule_send(None)
+
+    async def refresh_subscriptions(self, session: AsyncSession) -> None:
+        """
+        Перечитывает настройки всех пользователей одним запросом и обновляет
+        каталог запросов (параметры и подписчики по идентификатору запроса)
+        и расписание опроса.
 
         Args:
             session (AsyncSession): Сессия SQLAlchemy.
-            user (User): Объект пользователя.
-            timeout (int): Максимальное время ожидания.
 
         Returns:
             None
         """
-        telegram_id = user.telegram_id
-        async with self.semaphore:
+        started_at = self.query_counter.count
+        users_settings = await UserSettingsServices(session).get_all_users_settings()
+        catalog: Dict[str, Tuple[Dict, Set[int]]] = {}
+        user_queries: Dict[int, List[str]] = defaultdict(list)
+        for telegram_id, settings in users_settings.items():
             try:
-                logger.info(f"Обработка пользователя {telegram_id}")
-                vacancies = await asyncio.wait_for(
-                    VacanciesFinder(session, telegram_id).find_vacancies(),
-                    timeout=timeout
-                )
-                for vacancy in vacancies:
-                    if not await self.is_vacancy_sending(session, vacancy["id"], telegram_id):
-                        await asyncio.wait_for(self.vacancy_sending(vacancy, telegram_id), timeout=10)
-                        await self.vacancy_saving(session, vacancy, telegram_id)
-                        await asyncio.sleep(3)
-            except asyncio.TimeoutError:
-                logger.warning(
-                    f"Timeout при обработке пользователя {telegram_id}")
+                params_list = await VacanciesFinder(None, telegram_id, settings).generate_params_headhunter()
             except Exception as e:
                 logger.error(
-                    f"Ошибка при обработке пользователя {telegram_id}: {e}")
+                    f"Ошибка при формировании запросов пользователя {telegram_id}: {e}")
+                continue
+            for params in params_list:
+                query_id = make_query_id(params)
+                if query_id not in catalog:
+                    catalog[query_id] = (params, set())
+                if telegram_id not in catalog[query_id][1]:
+                    catalog[query_id][1].add(telegram_id)
+                    user_queries[telegram_id].append(query_id)
+        self.catalog = catalog
+        self.user_queries = dict(user_queries)
+        self.query_scheduler.sync({
+            query_id: repr(get_scope(params)) for query_id, (params, _) in catalog.items()
+        })
+        self.db_queries["refresh"] = self.query_counter.count - started_at
+        logger.info(
+            f"Подписки обновлены: пользователей {len(self.user_queries)}, запросов {len(self.catalog)}, "
+            f"запросов к базе: {self.db_queries['refresh']}")
+
+    async def plan_queries(self, session: AsyncSession, query_ids: List[str]) -> HeadhunterQueryPlanner:
+        """
+        Формирует план запросов шага: одинаковые запросы разных пользователей
+        выполняются один раз, а запросы одной локации объединяются с учетом
+        числа вакансий по ним в прошлый раз.
+
+        Вакансии по запросу ищутся начиная с сохраненной отметки (минус
+        перекрытие на случай расхождения часов), для новых запросов — за
+        последние HH_INITIAL_WINDOW_MINUTES минут.
+
+        Args:
+            session (AsyncSession): Сессия SQLAlchemy.
+            query_ids (List[str]): Запросы, время опроса которых наступило.
 
-    async def start_sending(self, sleep_time: int = 10) -> None:
+        Returns:
+            HeadhunterQueryPlanner: Планировщик, готовый к запуску.
         """
-        Запускает цикл отправки вакансий всем пользователям.
+        now = datetime.now()
+        planner = HeadhunterQueryPlanner(
+            self._round_date(
+                now - timedelta(minutes=HH_INITIAL_WINDOW_MINUTES)),
+            self.http_client, self.cache, self.rate_limiter,
+            max_concurrent_queries=PIPELINE_FETCH_WORKERS,
+            index=self.index)
+        for query_id in query_ids:
+            params, telegram_ids = self.catalog[query_id]
+            for telegram_id in telegram_ids:
+                planner.subscribe(telegram_id, [params])
+
+        watermarks = await QueryWatermarkHeadhunterDAO.get_watermarks(session, planner.query_ids)
+        min_date = now - timedelta(hours=HH_MAX_LOOKBACK_HOURS)
+        overlap = timedelta(minutes=HH_WATERMARK_OVERLAP_MINUTES)
+        planner.set_dates({
+            query_id: self._round_date(max(watermark - overlap, min_date))
+            for query_id, watermark in watermarks.items()
+        })
+        planner.set_watermarks(watermarks)
+        planner.set_estimates(self.query_estimates)
+        return planner
+
+    def get_user_lag(self, telegram_id: int) -> float:
+        """
+        Задержка последнего опроса запросов пользователя относительно расписания (сек).
 
         Args:
-            sleep_time (int): Задержка между итерациями (сек).
+            telegram_id (int): Telegram ID пользователя.
+
+        Returns:
+            float: Задержка (сек).
+        """
+        return self.query_scheduler.get_lag(self.user_queries.get(telegram_id, ()))
+
+    def get_users_lag_stats(self) -> Dict[str, float]:
+        """
+        Средняя и наибольшая задержка опроса по пользователям.
+
+        Returns:
+            Dict[str, float]: Статистика задержки.
+        """
+        lags = [self.get_user_lag(telegram_id) for telegram_id in self.user_queries]
+        return {
+            "users": len(lags),
+            "avg_lag": round(sum(lags) / len(lags), 3) if lags else 0.0,
+            "max_lag": round(max(lags, default=0.0), 3),
+        }
+
+    @staticmethod
+    def _round_date(date: datetime) -> datetime:
+        """
+        Округляет дату до минуты, чтобы соседние циклы попадали в кеш ответов.
+        """
+        return date.replace(second=0, microsecond=0)
+
+    async def match_vacancies(self, vacancies: List[VacancyHeadhunter], telegram_id: int) -> None:
+        """
+        Стадия сопоставления: проверка пачки вакансий пользователя на повтор,
+        сохранение новых в очередь отправки (outbox) и передача пользователя
+        стадии отправки.
+
+        Args:
+            vacancies (List[VacancyHeadhunter]): Вакансии пользователя.
+            telegram_id (int): Telegram ID пользователя.
+
+        Raises:
+            Exception: Ошибка проверки или сохранения: вакансии не попали в outbox.
+
+        Returns:
+            None
+        """
+        async with Session() as session:
+            vacancies = await self.filter_sent_vacancies(session, vacancies, telegram_id)
+        if not vacancies:
+            return
+        await self.enqueue_vacancies(vacancies, telegram_id)
+        await self.schedule_send(telegram_id)
+
+    async def _match_batch(self, vacancies: List[VacancyHeadhunter], telegram_id: int, failed: Set[int]) -> None:
+        """
+        Обрабатывает пачку вакансий пользователя. Пользователь, вакансии
+        которого не удалось сохранить, запоминается в failed, чтобы не
+        сдвигать отметки его запросов.
+        """
+        try:
+            await self.match_vacancies(vacancies, telegram_id)
+        except Exception as e:
+            failed.add(telegram_id)
+            logger.error(
+                f"Ошибка при обработке вакансий пользователя {telegram_id}: {e}")
+
+    async def schedule_send(self, telegram_id: Optional[int]) -> None:
+        """
+        Передает стадии отправки пользователя, у которого есть записи в очереди
+        отправки (outbox). Пользователь, уже ожидающий отправки, повторно не
+        добавляется, поэтому очередь стадии не больше числа пользователей.
+
+        Args:
+            telegram_id (Optional[int]): Telegram ID пользователя или None,
+                чтобы отправить записи всех пользователей.
+        """
+        if telegram_id in self._send_scheduled:
+            return
+        self._send_scheduled.add(telegram_id)
+        await self.send_queue.put(telegram_id)
+        self.queue_depths["send"] = max(self.queue_depths.get("send", 0), self.send_queue.qsize())
+
+    def _reschedule_send(self, telegram_id: Optional[int]) -> bool:
+        """
+        Возвращает пользователя с неотправленными записями в конец очереди
+        стадии отправки, не дожидаясь места в ней.
+
+        Args:
+            telegram_id (Optional[int]): Telegram ID пользователя или None.
+
+        Returns:
+            bool: False, если очередь заполнена и пользователя нужно
+                продолжать отправлять самому.
+        """
+        if telegram_id in self._send_scheduled:
+            return True
+        try:
+            self.send_queue.put_nowait(telegram_id)
+        except asyncio.QueueFull:
+            return False
+        self._send_scheduled.add(telegram_id)
+        return True
+
+    async def _match_worker(self, queue: asyncio.Queue, batches: Dict[int, List[VacancyHeadhunter]],
+                            seen: Dict[int, Set[str]], failed: Set[int]) -> None:
+        """
+        Исполнитель стадии сопоставления: раскладывает найденные вакансии по
+        пачкам пользователей без повторов и обрабатывает заполненные пачки,
+        а также пачки подписчиков завершенной группы запросов.
+        """
+        while True:
+            item = await queue.get()
+            self.queue_depths["match"] = max(self.queue_depths.get("match", 0), queue.qsize() + 1)
+            try:
+                if item is self._END:
+                    return
+                vacancy, telegram_ids = item
+                if vacancy is None:
+                    # Вакансии группы разложены по пачкам до ее завершения: очередь общая
+                    for telegram_id in telegram_ids:
+                        batch = batches.pop(telegram_id, None)
+                        if batch:
+                            await self._match_batch(batch, telegram_id, failed)
+                    continue
+                for telegram_id in telegram_ids:
+                    if vacancy.id in seen[telegram_id]:
+                        continue
+                    seen[telegram_id].add(vacancy.id)
+                    batches[telegram_id].append(vacancy)
+                    if len(batches[telegram_id]) >= self.dedup_batch_size:
+                        batch, batches[telegram_id] = batches[telegram_id], []
+                        await self._match_batch(batch, telegram_id, failed)
+            finally:
+                queue.task_done()
+
+    async def _send_worker(self) -> None:
+        """
+        Исполнитель стадии отправки: отправляет очередь (outbox) пользователя
+        (или всех пользователей). Работает независимо от шагов опроса.
+
+        За раз отправляется одна пачка, после чего пользователь с оставшимися
+        записями встает в конец очереди стадии: отправка в один чат ограничена
+        лимитом Telegram, и длинная очередь одного пользователя не должна
+        занимать исполнителя, пока остальные ждут.
+        """
+        while True:
+            telegram_id = await self.send_queue.get()
+            # Снимаем отметку до отправки: новые вакансии, сохраненные во время
+            # отправки, снова поставят пользователя в очередь
+            self._send_scheduled.discard(telegram_id)
+            try:
+                while await self.send_outbox_batch(telegram_id):
+                    if self._reschedule_send(telegram_id):
+                        break
+            except Exception as e:
+                logger.error(
+                    f"Ошибка при отправке вакансий пользователю {telegram_id}: {e}")
+            finally:
+                self.send_queue.task_done()
+
+    def start_send_workers(self) -> None:
+        """
+        Запускает исполнителей стадии отправки, если они еще не запущены.
+        """
+        if not self._send_workers:
+            self._send_workers = [asyncio.create_task(self._send_worker())
+                                  for _ in range(PIPELINE_SEND_WORKERS)]
+
+    async def run_cycle(self, planner: HeadhunterQueryPlanner) -> Set[int]:
+        """
+        Один шаг рассылки в виде конвейера из трех стадий, связанных
+        ограниченными очередями:
+
+        1. поиск — запросы к HeadHunter (PIPELINE_FETCH_WORKERS одновременно);
+        2. сопоставление — раскладка по пользователям, проверка на повтор и
+           сохранение в outbox (PIPELINE_MATCH_WORKERS исполнителей);
+        3. отправка — отправка outbox пользователей (PIPELINE_SEND_WORKERS исполнителей).
+
+        Заполненная очередь притормаживает предыдущую стадию, поэтому поиск
+        не копит вакансии в памяти. Шаг завершается, когда новые вакансии
+        сохранены в outbox, и не ждет их отправки: исполнители стадии
+        отправки разбирают outbox в фоне, поэтому медленная отправка в
+        Telegram не задерживает следующие запросы к HeadHunter, а отметки
+        можно сохранять сразу — неотправленное не потеряется.
+
+        Args:
+            planner (HeadhunterQueryPlanner): Планировщик запросов шага.
+
+        Returns:
+            Set[int]: Telegram ID пользователей, вакансии которых не удалось
+                сохранить в outbox.
+        """
+        self.queue_depths = {}
+        self.start_send_workers()
+        match_queue = asyncio.Queue(maxsize=PIPELINE_MATCH_QUEUE_SIZE)
+        batches: Dict[int, List[VacancyHeadhunter]] = defaultdict(list)
+        seen: Dict[int, Set[str]] = defaultdict(set)
+        failed: Set[int] = set()
+        workers = [asyncio.create_task(self._match_worker(match_queue, batches, seen, failed))
+                   for _ in range(PIPELINE_MATCH_WORKERS)]
+        try:
+            planner.start(match_queue)
+            await planner.wait()
+            for _ in workers:
+                await match_queue.put(self._END)
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+
+        semaphore = asyncio.Semaphore(PIPELINE_MATCH_WORKERS)
+
+        async def match_rest(telegram_id: int, batch: List[VacancyHeadhunter]) -> None:
+            async with semaphore:
+                await self._match_batch(batch, telegram_id, failed)
+
+        await asyncio.gather(*(match_rest(telegram_id, batch)
+                               for telegram_id, batch in batches.items() if batch))
+        self.queue_depths["matched"] = sum(len(ids) for ids in seen.values())
+        return failed
+
+    async def run_tick(self) -> None:
+        """
+        Один шаг рассылки: опрос запросов, время которых наступило.
+        """
+        query_ids = self.query_scheduler.pop_due()
+        if not query_ids:
+            return
+        started_at = time.monotonic()
+        queries_before = self.query_counter.count
+        async with Session() as session:
+            planner = await self.plan_queries(session, query_ids)
+        failed = await self.run_cycle(planner)
+        self.query_estimates.update(planner.get_estimates())
+        for query_id, found in planner.get_fresh_counts().items():
+            self.query_scheduler.record(query_id, found)
+        # Отметки запросов, вакансии которых сохранены не всем подписчикам,
+        # не сдвигаются: в следующий раз эти вакансии будут найдены снова
+        watermarks = {
+            query_id: watermark for query_id, watermark in planner.get_watermarks().items()
+            if failed.isdisjoint(self.catalog[query_id][1])
+        }
+        if failed:
+            logger.warning(
+                f"Вакансии {len(failed)} пользователей не сохранены, отметки "
+                f"{len(planner.get_watermarks()) - len(watermarks)} запросов не обновлены")
+        async with Session() as session:
+            await QueryWatermarkHeadhunterDAO.save_watermarks(session, watermarks)
+            await session.commit()
+        self.db_queries["tick"] = self.query_counter.count - queries_before
+        logger.info(
+            f"Опрошено {len(query_ids)} запросов за {time.monotonic() - started_at:.3f} сек., "
+            f"запросов к базе: {self.db_queries['tick']}")
+
+    def log_stats(self) -> None:
+        """
+        Выводит в лог статистику рассылки.
+        """
+        logger.info(
+            f"Статистика расписания опроса: {self.query_scheduler.get_stats()}")
+        logger.info(
+            f"Запросов к базе: всего {self.query_counter.count}, последнее обновление подписок "
+            f"{self.db_queries.get('refresh', 0)}, последний шаг {self.db_queries.get('tick', 0)}")
+        logger.info(
+            f"Задержка опроса пользователей: {self.get_users_lag_stats()}")
+        logger.info(
+            f"Статистика HTTP-соединений: {self.http_client.get_stats()}")
+        if self.cache:
+            logger.info(
+                f"Статистика кеша HeadHunter: {self.cache.get_stats()}")
+        logger.info(
+            f"Глубина очередей конвейера: {self.queue_depths}")
+        logger.info(
+            f"Статистика отправки сообщений: {self.send_scheduler.get_stats()}")
+        logger.info(
+            f"Статистика записи отправленных вакансий: {self.sent_writer.get_stats()}")
+        if self.sent_filter:
+            logger.info(
+                f"Статистика фильтра отправленных вакансий: {self.sent_filter.get_stats()}")
+
+    async def start_sending(self, tick: float = POLL_TICK) -> None:
+        """
+        Запускает рассылку вакансий всем пользователям.
+
+        Запросы опрашиваются по расписанию (QueryScheduler), равномерно
+        распределенному по интервалу опроса, а не все сразу. Раз в
+        POLL_REFRESH_INTERVAL секунд перечитываются настройки пользователей,
+        возвращаются зависшие записи очереди отправки и выводится статистика.
+
+        Args:
+            tick (float): Максимальная пауза между шагами (сек).
 
         Returns:
             None
         """
+        # Запросы к базе этой задачи и порожденных ею задач конвейера
+        query_counter.set(self.query_counter)
+        claim_timeout = 0
+        refresh_at = 0.0
         while True:
-            async with Session() as session:
-                try:
-                    users = await UserDAO.find_all(session, {})
-                    logger.info(
-                        f"Начинаем обработку {len(users)} пользователей")
-                    tasks = [self.process_user(session, user)
-                             for user in users]
-                    await asyncio.gather(*tasks)
-                    await session.commit()
-                except Exception as e:
-                    logger.error(
-                        f"Глобальная ошибка в процессе отправки вакансий: {e}")
-                finally:
-                    await session.close()
-                    logger.info("Сессия sender закрыта")
-            await asyncio.sleep(sleep_time)
+            try:
+                if time.monotonic() >= refresh_at:
+                    if refresh_at:
+                        self.log_stats()
+                    refresh_at = time.monotonic() + POLL_REFRESH_INTERVAL
+                    # При запуске все захваченные записи остались от прошлого процесса
+                    await self.resume_outbox(claim_timeout)
+                    claim_timeout = OUTBOX_CLAIM_TIMEOUT
+                    async with Session() as session:
+                        await self.refresh_subscriptions(session)
+                await self.run_tick()
+            except Exception as e:
+                logger.error(
+                    f"Глобальная ошибка в процессе отправки вакансий: {e}")
+            await asyncio.sleep(min(tick, self.query_scheduler.get_seconds_to_next()))
+
+    def start(self) -> None:
+        """
+        Запускает рассылку в фоне.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self.start_sending())
+
+    async def close(self) -> None:
+        """
+        Останавливает рассылку и исполнителей стадии отправки и дожидается их
+        завершения. Вызывается до закрытия буфера записи, планировщика отправки
+        и HTTP-клиента, чтобы после этого в них ничего не попадало. Записи
+        очереди, отправка которых прервана, будут отправлены после перезапуска.
+        """
+        tasks = self._send_workers + ([self._task] if self._task else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._send_workers = []
+        self._task = None
@@ -1,4 +1,5 @@
-from dao.database import Base
+from database.database import Base
+import database.models  # noqa: F401 — регистрирует таблицы в Base.metadata
 from settings import DATABASE_URL
 from alembic import context
 from sqlalchemy.ext.asyncio import async_engine_from_config
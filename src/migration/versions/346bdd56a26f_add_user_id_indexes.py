@@ -0,0 +1,73 @@
+"""add user_id indexes
+
+Revision ID: 346bdd56a26f
+Revises: a7ca05e7017f
+Create Date: 2026-10-17 01:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '346bdd56a26f'
+down_revision: Union[str, None] = 'a7ca05e7017f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Индексы по user_id таблиц настроек и неотправленных вакансий
+# (таблица неотправленных создается в c069180ee00b, если ее еще нет)
+USER_ID_INDEXES = {
+    "ix_locations_user_id": "locations",
+    "ix_grades_user_id": "grades",
+    "ix_salaries_user_id": "salaries",
+    "ix_specialities_user_id": "specialities",
+    "ix_failed_vacancies_headhunter_user_id": "failed_vacancies_headhunter",
+}
+
+SENT_TABLE = "sent_vacancies_headhunter"
+SENT_UNIQUE_INDEX = "uq_sent_vacancies_headhunter_user_vacancy"
+SENT_CREATED_AT_INDEX = "ix_sent_vacancies_headhunter_user_id_created_at"
+
+
+def _has_unique_user_vacancy(inspector: sa.Inspector) -> bool:
+    """
+    Есть ли уже уникальность (user_id, vacancy_id): базы, созданные через
+    create_all после ее добавления в модель, получили ее как ограничение таблицы.
+    """
+    columns = ["user_id", "vacancy_id"]
+    constraints = inspector.get_unique_constraints(SENT_TABLE)
+    indexes = [index for index in inspector.get_indexes(SENT_TABLE) if index["unique"]]
+    return any(item["column_names"] == columns for item in constraints + indexes)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    for name, table in USER_ID_INDEXES.items():
+        if table in tables:
+            op.create_index(name, table, ["user_id"], if_not_exists=True)
+
+    if SENT_TABLE in tables:
+        if not _has_unique_user_vacancy(inspector):
+            # Повторные отправки, записанные до появления уникальности
+            op.execute(
+                f"DELETE FROM {SENT_TABLE} WHERE id NOT IN "
+                f"(SELECT MIN(id) FROM {SENT_TABLE} GROUP BY user_id, vacancy_id)")
+            op.create_index(SENT_UNIQUE_INDEX, SENT_TABLE,
+                            ["user_id", "vacancy_id"], unique=True)
+        op.create_index(SENT_CREATED_AT_INDEX, SENT_TABLE,
+                        ["user_id", "created_at"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(SENT_CREATED_AT_INDEX, table_name=SENT_TABLE, if_exists=True)
+    op.drop_index(SENT_UNIQUE_INDEX, table_name=SENT_TABLE, if_exists=True)
+    for name, table in USER_ID_INDEXES.items():
+        op.drop_index(name, table_name=table, if_exists=True)
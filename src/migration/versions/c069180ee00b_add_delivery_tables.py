@@ -0,0 +1,77 @@
+"""add delivery tables
+
+Revision ID: c069180ee00b
+Revises: 346bdd56a26f
+Create Date: 2026-10-17 02:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c069180ee00b'
+down_revision: Union[str, None] = '346bdd56a26f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _base_columns() -> list:
+    """
+    Общие колонки моделей (database.database.Base).
+    """
+    return [
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Таблицы могли быть созданы раньше через init_db (create_all) при запуске бота
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "outbox_vacancies_headhunter" not in tables:
+        op.create_table(
+            "outbox_vacancies_headhunter",
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("vacancy_id", sa.BigInteger(), nullable=False),
+            sa.Column("message", sa.String(), nullable=False),
+            sa.Column("link", sa.String(), nullable=True),
+            sa.Column("claimed_at", sa.TIMESTAMP(), nullable=True),
+            sa.Column("attempts", sa.Integer(), nullable=False),
+            *_base_columns(),
+            sa.UniqueConstraint("user_id", "vacancy_id",
+                                name="uq_outbox_vacancies_headhunter_user_vacancy"),
+        )
+
+    if "failed_vacancies_headhunter" not in tables:
+        op.create_table(
+            "failed_vacancies_headhunter",
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("vacancy_id", sa.BigInteger(), nullable=False),
+            sa.Column("error", sa.String(), nullable=False),
+            *_base_columns(),
+        )
+    op.create_index("ix_failed_vacancies_headhunter_user_id", "failed_vacancies_headhunter",
+                    ["user_id"], if_not_exists=True)
+
+    if "query_watermarks_headhunter" not in tables:
+        op.create_table(
+            "query_watermarks_headhunter",
+            sa.Column("query_id", sa.String(), nullable=False, unique=True),
+            sa.Column("published_at", sa.TIMESTAMP(), nullable=False),
+            *_base_columns(),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("query_watermarks_headhunter", if_exists=True)
+    op.drop_index("ix_failed_vacancies_headhunter_user_id",
+                  table_name="failed_vacancies_headhunter", if_exists=True)
+    op.drop_table("failed_vacancies_headhunter", if_exists=True)
+    op.drop_table("outbox_vacancies_headhunter", if_exists=True)
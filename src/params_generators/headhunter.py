@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from params_generators.utils import merge_dicts, format_date
 
@@ -88,7 +88,20 @@ class ParamsGeneratorHeadhunter:
                     params, params_configurator[characteristic])
         return params
 
-    def get_params(self, locations: List[str], specialities: List[str], grade: str, salary: float | int, date: datetime) -> dict:
+    def add_date(self, params: dict, date: datetime) -> dict:
+        """
+        Добавляет к готовым параметрам фильтр по дате публикации.
+
+        Args:
+            params (dict): Параметры запроса без даты.
+            date (datetime): Дата, с которой нужно фильтровать вакансии.
+
+        Returns:
+            dict: Новый словарь параметров с 'date_from'.
+        """
+        return {**params, **self._get_params_from_date(date)}
+
+    def get_params(self, locations: List[str], specialities: List[str], grade: str, salary: float | int, date: Optional[datetime] = None) -> dict:
         """
         Формирует итоговый словарь параметров для запроса к API HeadHunter.
 
@@ -97,7 +110,8 @@ class ParamsGeneratorHeadhunter:
             specialities (List[str]): Список специальностей.
             grade (str): Уровень опыта.
             salary (float | int): Минимальная зарплата.
-            date (datetime): Дата публикации вакансии.
+            date (Optional[datetime]): Дата публикации вакансии. Если не передана,
+                фильтр по дате не добавляется (см. add_date).
 
         Returns:
             dict: Словарь всех параметров для запроса.
@@ -109,6 +123,7 @@ class ParamsGeneratorHeadhunter:
             specialities, self._SPETIALITIES_PARAMS))
         params = merge_dicts(params, self._get_params_from_grade(grade))
         params = merge_dicts(params, self._get_params_from_salary(salary))
-        params = merge_dicts(params, self._get_params_from_date(date))
+        if date:
+            params = self.add_date(params, date)
 
         return params
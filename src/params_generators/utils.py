@@ -1,5 +1,8 @@
+import hashlib
+import json
 from collections import defaultdict
 from datetime import datetime, timezone, timedelta
+from typing import Optional, Tuple
 
 
 def merge_dicts(*dicts):
@@ -28,3 +31,39 @@ def format_date(date: datetime) -> str:
     Форматирует дату в ISO-формат, устанавливая часовой пояс UTC+3.
     """
     return date.replace(tzinfo=timezone(timedelta(hours=3))).isoformat()
+
+
+def parse_date(value: Optional[str]) -> Optional[datetime]:
+    """
+    Преобразует дату из ответа API в datetime без часового пояса (UTC+3),
+    то есть в тот же вид, который принимает format_date.
+    """
+    if not value:
+        return None
+    date = datetime.fromisoformat(value)
+    if date.tzinfo:
+        date = date.astimezone(timezone(timedelta(hours=3))).replace(tzinfo=None)
+    return date
+
+
+def make_query_key(params: dict) -> Tuple:
+    """
+    Формирует канонический хешируемый ключ из параметров запроса.
+    Порядок ключей и значений в списках не влияет на результат.
+    """
+    key = []
+    for name, value in sorted(params.items()):
+        if isinstance(value, (list, tuple, set)):
+            value = tuple(sorted(str(item) for item in value))
+        else:
+            value = str(value)
+        key.append((name, value))
+    return tuple(key)
+
+
+def make_query_id(params: dict) -> str:
+    """
+    Формирует короткий стабильный идентификатор запроса для хранения в базе данных.
+    """
+    key = json.dumps(make_query_key(params), ensure_ascii=False)
+    return hashlib.sha1(key.encode()).hexdigest()
@@ -17,6 +17,92 @@ REDIS_URL = f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}"
 # Настройки sqlite3
 DB_NAME = os.getenv("DB_NAME")
 DATABASE_URL = f"sqlite+aiosqlite:///./data/{DB_NAME}.sqlite3"
+# Пул соединений: у каждой задачи рассылки своя короткая сессия
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+# Профиль производительности SQLite: "performance" (WAL и PRAGMA ниже) или "default"
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "performance")
+# Действует только для новой базы (для существующей — после VACUUM)
+SQLITE_AUTO_VACUUM = os.getenv("SQLITE_AUTO_VACUUM", "INCREMENTAL")
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", -65536))  # < 0 — в КиБ (64 МиБ)
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 268435456))  # 256 МиБ
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", 5000))  # мс
+SQLITE_TEMP_STORE = os.getenv("SQLITE_TEMP_STORE", "MEMORY")
+
+# Настройки HTTP-клиента
+HTTP_LIMIT = int(os.getenv("HTTP_LIMIT", 100))
+HTTP_LIMIT_PER_HOST = int(os.getenv("HTTP_LIMIT_PER_HOST", 20))
+HTTP_DNS_CACHE_TTL = int(os.getenv("HTTP_DNS_CACHE_TTL", 300))
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", 30))
+
+# Настройки HeadHunter
+HH_PER_PAGE = int(os.getenv("HH_PER_PAGE", 100))  # максимум API — 100
+HH_MAX_CONCURRENT_PAGES = int(os.getenv("HH_MAX_CONCURRENT_PAGES", 5))
+HH_INITIAL_WINDOW_MINUTES = int(os.getenv("HH_INITIAL_WINDOW_MINUTES", 10))
+HH_WATERMARK_OVERLAP_MINUTES = int(
+    os.getenv("HH_WATERMARK_OVERLAP_MINUTES", 2))
+HH_MAX_LOOKBACK_HOURS = int(os.getenv("HH_MAX_LOOKBACK_HOURS", 24))
+HH_CACHE_BACKEND = os.getenv("HH_CACHE_BACKEND", "memory")  # memory, redis или none
+# Меньше POLL_INTERVAL: повторный опрос запроса не должен получать ответ прошлого опроса
+HH_CACHE_TTL = int(os.getenv("HH_CACHE_TTL", 5))
+HH_CACHE_MAX_SIZE = int(os.getenv("HH_CACHE_MAX_SIZE", 5000))
+HH_RATE_LIMIT = float(os.getenv("HH_RATE_LIMIT", 10))  # запросов в секунду
+HH_MAX_RETRIES = int(os.getenv("HH_MAX_RETRIES", 3))
+HH_BACKOFF_BASE = float(os.getenv("HH_BACKOFF_BASE", 0.5))
+HH_BACKOFF_MAX = float(os.getenv("HH_BACKOFF_MAX", 30))
+HH_CIRCUIT_FAILURE_THRESHOLD = int(
+    os.getenv("HH_CIRCUIT_FAILURE_THRESHOLD", 10))
+HH_CIRCUIT_RECOVERY_TIMEOUT = float(
+    os.getenv("HH_CIRCUIT_RECOVERY_TIMEOUT", 60))
+
+# Настройки отправки сообщений (лимиты Bot API)
+TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", 30))  # сообщений в секунду
+TELEGRAM_CHAT_RATE = float(os.getenv("TELEGRAM_CHAT_RATE", 1))  # сообщений в секунду в один чат
+TELEGRAM_MAX_RETRIES = int(os.getenv("TELEGRAM_MAX_RETRIES", 3))
+TELEGRAM_BACKOFF_BASE = float(os.getenv("TELEGRAM_BACKOFF_BASE", 1))
+TELEGRAM_BACKOFF_MAX = float(os.getenv("TELEGRAM_BACKOFF_MAX", 60))
+
+# Настройки расписания опроса: запросы распределяются по интервалу равномерно
+POLL_INTERVAL = float(os.getenv("POLL_INTERVAL", 10))
+POLL_TICK = float(os.getenv("POLL_TICK", 1))
+POLL_MAX_QUERIES_PER_TICK = int(os.getenv("POLL_MAX_QUERIES_PER_TICK", 100))
+POLL_REFRESH_INTERVAL = float(os.getenv("POLL_REFRESH_INTERVAL", 60))
+# Подстройка частоты опроса: тихие запросы опрашиваются реже, вплоть до
+# POLL_MAX_INTERVAL, так чтобы за опрос появлялось около POLL_TARGET_VACANCIES новых вакансий
+POLL_MAX_INTERVAL = float(os.getenv("POLL_MAX_INTERVAL", 320))
+POLL_TARGET_VACANCIES = float(os.getenv("POLL_TARGET_VACANCIES", 1))
+POLL_RATE_SMOOTHING = float(os.getenv("POLL_RATE_SMOOTHING", 0.3))
+
+# Настройки конвейера рассылки: исполнители и размеры очередей стадий
+PIPELINE_FETCH_WORKERS = int(os.getenv("PIPELINE_FETCH_WORKERS", 10))
+PIPELINE_MATCH_WORKERS = int(os.getenv("PIPELINE_MATCH_WORKERS", 4))
+PIPELINE_SEND_WORKERS = int(os.getenv("PIPELINE_SEND_WORKERS", 20))
+PIPELINE_MATCH_QUEUE_SIZE = int(os.getenv("PIPELINE_MATCH_QUEUE_SIZE", 1000))
+PIPELINE_SEND_QUEUE_SIZE = int(os.getenv("PIPELINE_SEND_QUEUE_SIZE", 1000))
+
+# Настройки очереди отправки (outbox)
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 100))
+OUTBOX_CLAIM_TIMEOUT = float(os.getenv("OUTBOX_CLAIM_TIMEOUT", 300))  # сек
+
+# Настройки фильтра отправленных вакансий
+SENT_FILTER_BACKEND = os.getenv("SENT_FILTER_BACKEND", "memory")  # memory, redis или none
+SENT_FILTER_CAPACITY = int(os.getenv("SENT_FILTER_CAPACITY", 1000000))
+SENT_FILTER_ERROR_RATE = float(os.getenv("SENT_FILTER_ERROR_RATE", 0.001))
+
+# Настройки записи отправленных вакансий
+SENT_WRITER_BATCH_SIZE = int(os.getenv("SENT_WRITER_BATCH_SIZE", 500))
+SENT_WRITER_FLUSH_INTERVAL = float(
+    os.getenv("SENT_WRITER_FLUSH_INTERVAL", 5))  # сек
+
+# Настройки очистки отправленных вакансий (0 дней — без очистки)
+SENT_RETENTION_DAYS = int(os.getenv("SENT_RETENTION_DAYS", 90))
+SENT_RETENTION_BATCH_SIZE = int(os.getenv("SENT_RETENTION_BATCH_SIZE", 5000))
+SENT_RETENTION_INTERVAL = float(os.getenv("SENT_RETENTION_INTERVAL", 3600))  # сек
+SENT_RETENTION_PAUSE = float(os.getenv("SENT_RETENTION_PAUSE", 0.1))  # сек
+SENT_RETENTION_VACUUM_PAGES = int(os.getenv("SENT_RETENTION_VACUUM_PAGES", 10000))
 
 # Настройки GIT
 GIT_BRANCH = os.getenv("GIT_BRANCH")